@@ -14,6 +14,12 @@ class BaseAgent(ABC):
         self.odds_data = OddsClient()
         self.weather_data = WeatherClient()
         self.llm = llm
+    
+    async def close(self) -> None:
+        """Close the data clients' pooled HTTP sessions; the shared LLM is left open."""
+        await self.sports_data.close()
+        await self.odds_data.close()
+        await self.weather_data.close()
         
     @abstractmethod
     async def analyze(self, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -5,9 +5,23 @@ from ..services.bet_analyzer import BetAnalyzer
 
 logger = logging.getLogger(__name__)
 
+# OCR bet-line patterns, compiled once at import
+_BET_LINE_RE = re.compile(
+    r'([\w\s]+?)?\s*(ML|[\+\-]\d+\.\d|O/U\s*\d+\.\d)?\s*([\+\-]\d+|\d+[\+\-])\s*(\$?\d+\$?)?',
+    re.IGNORECASE
+)
+_WAGER_LINE_RE = re.compile(r'(Wager|To Win):\s*\$(\d+)', re.IGNORECASE)
+_SIGNED_ODDS_RE = re.compile(r'[\+\-]\d+')
+_ANY_ODDS_RE = re.compile(r'([\+\-]\d+|\d+[\+\-])')
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+
 class ParlayAnalysisAgent:
     def __init__(self, llm=None):
         self.bet_analyzer = BetAnalyzer(llm)
+    
+    async def close(self) -> None:
+        """Close the bet analyzer's pooled HTTP session."""
+        await self.bet_analyzer.close()
         
     async def analyze(self, data: Dict) -> str:
         """Analyze parlay bet data and return formatted analysis."""
@@ -49,15 +63,12 @@ class ParlayAnalysisAgent:
     def _parse_ocr_text(self, text: str) -> List[Dict]:
         """Parse noisy OCR text into structured bet data."""
         bets = []
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        stripped = (line.strip() for line in text.splitlines())
+        lines = [line for line in stripped if line]
         
         for line in lines:
             # Match team/player name, bet type (ML, spread, total), odds, and optional wager
-            bet_match = re.match(
-                r'([\w\s]+?)?\s*(ML|[\+\-]\d+\.\d|O/U\s*\d+\.\d)?\s*([\+\-]\d+|\d+[\+\-])\s*(\$?\d+\$?)?',
-                line,
-                re.IGNORECASE
-            )
+            bet_match = _BET_LINE_RE.match(line)
             if bet_match:
                 player_team = bet_match.group(1).strip() if bet_match.group(1) else 'Unknown'
                 bet_type = bet_match.group(2) or 'ML'
@@ -77,22 +88,22 @@ class ParlayAnalysisAgent:
                 })
             
             # Match wager or payout lines (e.g., "Wager: $100", "To Win: $280")
-            wager_match = re.match(r'(Wager|To Win):\s*\$(\d+)', line, re.IGNORECASE)
+            wager_match = _WAGER_LINE_RE.match(line)
             if wager_match and bets:
                 bets[-1][wager_match.group(1).lower()] = f"${wager_match.group(2)}"
         
         # Clean up noisy text
         for bet in bets:
             # Ensure odds are valid (e.g., "+258")
-            if not re.match(r'[\+\-]\d+', bet['odds']):
-                cleaned_odds = re.search(r'([\+\-]\d+|\d+[\+\-])', bet['odds'])
+            if not _SIGNED_ODDS_RE.match(bet['odds']):
+                cleaned_odds = _ANY_ODDS_RE.search(bet['odds'])
                 if cleaned_odds:
                     odds = cleaned_odds.group(1)
                     if odds[-1] in ['+', '-']:
                         odds = odds[-1] + odds[:-1]
                     bet['odds'] = odds
             # Clean player name
-            bet['player'] = re.sub(r'[^\w\s]', '', bet['player']).strip()
+            bet['player'] = _NON_WORD_RE.sub('', bet['player']).strip()
         
         return bets
 
@@ -8,6 +8,7 @@ from ..agents.parlay_agent import ParlayAnalysisAgent
 from ..agents.matchup_agent import MatchupAnalysisAgent
 from ..agents.value_agent import ValueBettingAgent
 from ..agents.bankroll_agent import BankrollManagementAgent
+from ..services.sportsdb_api import SportsDBAPI
 import pytesseract
 import cv2
 import numpy as np
@@ -173,26 +174,27 @@ You can also use commands:
         
         try:
             text = update.message.text
+            text_lower = text.lower()
             
-            if any(word in text.lower() for word in ['parlay', 'ticket', 'slip']) and len(text.split('\n')) > 2:
+            if any(word in text_lower for word in ['parlay', 'ticket', 'slip']) and text.count('\n') >= 2:
                 parlays = self._split_parlays(text)
                 if len(parlays) > 1:
                     await self._analyze_multiple_parlays(update, parlays)
                     return
 
-            if any(word in text.lower() for word in ['parlay', 'ticket', 'slip', 'multi']):
+            if any(word in text_lower for word in ['parlay', 'ticket', 'slip', 'multi']):
                 analysis = await self.parlay_agent.analyze({'text': text})
                 await self._format_parlay_response(update, analysis)
             
-            elif 'vs' in text or any(word in text.lower() for word in ['matchup', 'game', 'match', 'playing']):
+            elif 'vs' in text or any(word in text_lower for word in ['matchup', 'game', 'match', 'playing']):
                 analysis = await self.matchup_agent.analyze({'text': text})
                 await self._format_matchup_response(update, analysis)
             
-            elif any(word in text.lower() for word in ['value', 'odds', 'price', 'line']):
+            elif any(word in text_lower for word in ['value', 'odds', 'price', 'line']):
                 analysis = await self.value_agent.analyze({'text': text})
                 await self._format_value_response(update, analysis)
             
-            elif any(word in text.lower() for word in ['bankroll', 'stake', 'bet size', 'units']):
+            elif any(word in text_lower for word in ['bankroll', 'stake', 'bet size', 'units']):
                 analysis = await self.bankroll_agent.analyze({'text': text})
                 await self._format_bankroll_response(update, analysis)
             
@@ -653,6 +655,7 @@ You can also use commands:
         self.application = (
             Application.builder()
             .token(self.token)
+            .post_shutdown(self._shutdown)
             .build()
         )
         print("✓ Application built")
@@ -687,6 +690,18 @@ You can also use commands:
         print("\nAll handlers registered successfully")
         print("="*50 + "\n")
 
+    async def _shutdown(self, application: Application) -> None:
+        """Close pooled HTTP sessions once polling has stopped."""
+        for agent in (self.parlay_agent, self.matchup_agent, self.value_agent, self.bankroll_agent):
+            await agent.close()
+        
+        # The LLM is shared by every agent, so it is closed once here
+        llm = self.matchup_agent.llm
+        if llm is not None and hasattr(llm, 'close'):
+            await llm.close()
+        
+        await SportsDBAPI.close()
+
     async def _error_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Log errors and send a message to the user."""
         logger.error(f"Update {update} caused error {context.error}", exc_info=context.error)
@@ -1,6 +1,7 @@
 import logging
 from typing import Dict
 import aiohttp
+import orjson
 from ..config import Config
 
 logger = logging.getLogger(__name__)
@@ -22,7 +23,7 @@ class SportsDataClient:
                 params = {'p': player_name}
                 
                 async with session.get(search_url, params=params) as response:
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     if not data.get('player'):
                         logger.warning(f"No player found for name: {player_name}")
                         return {}
@@ -35,7 +36,7 @@ class SportsDataClient:
                     params = {'id': player_id}
                     
                     async with session.get(stats_url, params=params) as response:
-                        stats_data = await response.json()
+                        stats_data = orjson.loads(await response.read())
                         return {
                             'name': player['strPlayer'],
                             'team': player.get('strTeam', ''),
@@ -59,7 +60,7 @@ class SportsDataClient:
                 params = {'t': team_name}
                 
                 async with session.get(search_url, params=params) as response:
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     if not data.get('teams'):
                         logger.warning(f"No team found for name: {team_name}")
                         return {}
@@ -72,7 +73,7 @@ class SportsDataClient:
                     params = {'id': team_id}
                     
                     async with session.get(events_url, params=params) as response:
-                        events_data = await response.json()
+                        events_data = orjson.loads(await response.read())
                         recent_events = events_data.get('results', [])
                         
                         return {
@@ -36,6 +36,14 @@ class SportsBettingCoordinator:
         # Initialize query handler
         self.query_handler = QueryHandler()
     
+    async def close(self) -> None:
+        """Release pooled connections held by the data clients."""
+        await self.sports_data.close()
+        await self.odds_data.close()
+        await self.weather_data.close()
+        await self.search_client.close()
+        await self.deepseek.close()
+    
     async def process_user_input(self, text: str) -> Dict[str, Any]:
         """Process natural language user input."""
         # Parse the query
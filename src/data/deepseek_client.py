@@ -23,6 +23,34 @@ class DeepSeekClient:
             "stream": False
         }
         
+        # Shared HTTP/2 client so repeated calls multiplex over one connection
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Prompt builders by analysis type
+        self._prompt_builders = {
+            "parlay": self._create_parlay_prompt,
+            "player_props": self._create_player_props_prompt,
+            "game_analysis": self._create_game_analysis_prompt
+        }
+        
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=75
+                )
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Close the shared HTTP client."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        
     async def analyze_betting_context(
         self,
         context: Dict[str, Any],
@@ -58,14 +86,10 @@ class DeepSeekClient:
         analysis_type: str
     ) -> str:
         """Create appropriate prompt based on analysis type."""
-        if analysis_type == "parlay":
-            return self._create_parlay_prompt(context)
-        elif analysis_type == "player_props":
-            return self._create_player_props_prompt(context)
-        elif analysis_type == "game_analysis":
-            return self._create_game_analysis_prompt(context)
-        else:
-            return self._create_general_analysis_prompt(context)
+        builder = self._prompt_builders.get(
+            analysis_type, self._create_general_analysis_prompt
+        )
+        return builder(context)
     
     def _create_parlay_prompt(self, context: Dict[str, Any]) -> str:
         """Create prompt for parlay analysis."""
@@ -156,17 +180,17 @@ class DeepSeekClient:
             **self.default_params
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=data
-            )
+        client = self._get_client()
+        response = await client.post(
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json=data
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"API call failed: {response.text}")
             
-            if response.status_code != 200:
-                raise Exception(f"API call failed: {response.text}")
-                
-            return response.json()
+        return response.json()
     
     def _parse_analysis_response(
         self,
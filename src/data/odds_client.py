@@ -1,30 +1,76 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import aiohttp
-from datetime import datetime, timedelta
+import orjson
+from cachetools import TTLCache
+from datetime import datetime
 import os
+from types import MappingProxyType
+
+# Internal sport name -> API sport key
+_SPORT_KEYS = MappingProxyType({
+    'NFL': 'americanfootball_nfl',
+    'NBA': 'basketball_nba',
+    'MLB': 'baseball_mlb',
+    'NHL': 'icehockey_nhl',
+    'UFC': 'mma_mixed_martial_arts',
+    'Soccer': 'soccer_epl'  # Default to EPL, can be expanded
+})
 
 class OddsClient:
     """Client for fetching betting odds from various sources."""
     
+    bookmakers = (
+        'fanduel', 'draftkings', 'betmgm', 'caesars',
+        'pointsbet', 'barstool', 'wynn'
+    )
+    _BOOKMAKERS_CSV = ','.join(bookmakers)
+    
     def __init__(self):
         self.api_key = os.getenv('ODDS_API_KEY')
         self.base_url = "https://api.the-odds-api.com/v4"
-        self.cache = {}
-        self.bookmakers = [
-            'fanduel', 'draftkings', 'betmgm', 'caesars',
-            'pointsbet', 'barstool', 'wynn'
-        ]
+        self.cache = TTLCache(maxsize=512, ttl=300)  # Short cache for odds
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            # Single-host API: allow many keep-alive connections and keep them
+            # open past aiohttp's 15s default so bursts reuse TLS sessions
+            connector = aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=30,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
     
     async def get_odds(self, sport: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Get odds for a specific betting opportunity."""
         cache_key = self._generate_cache_key(sport, context)
         
         # Check cache first
-        if cache_key in self.cache:
-            cache_time, data = self.cache[cache_key]
-            if datetime.now() - cache_time < timedelta(minutes=5):  # Short cache for odds
-                return data
+        data = self.cache.get(cache_key)
+        if data is not None:
+            return data
         
+        # Coalesce concurrent requests for the same key onto a single fetch
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_odds(sport, context, cache_key))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return await asyncio.shield(task)
+    
+    async def _fetch_odds(self, sport: str, context: Dict[str, Any], cache_key: str) -> Dict[str, Any]:
+        """Fetch odds from the API and cache the result."""
         # Determine what type of odds to fetch
         if self._is_prop_bet(context):
             odds = await self._get_prop_odds(sport, context)
@@ -32,7 +78,7 @@ class OddsClient:
             odds = await self._get_game_odds(sport, context)
             
         # Cache results
-        self.cache[cache_key] = (datetime.now(), odds)
+        self.cache[cache_key] = odds
         return odds
     
     async def _get_prop_odds(self, sport: str, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -41,51 +87,43 @@ class OddsClient:
         player = context.get('player', '')
         prop_type = context.get('prop_type', '')
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/sports/{sport_key}/players/{player}/markets",
-                params={
-                    'apiKey': self.api_key,
-                    'bookmakers': ','.join(self.bookmakers)
-                }
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return self._process_prop_odds(data, prop_type)
-                else:
-                    return {"error": f"Failed to fetch prop odds: {response.status}"}
+        session = self._get_session()
+        async with session.get(
+            f"{self.base_url}/sports/{sport_key}/players/{player}/markets",
+            params={
+                'apiKey': self.api_key,
+                'bookmakers': self._BOOKMAKERS_CSV
+            }
+        ) as response:
+            if response.status == 200:
+                data = orjson.loads(await response.read())
+                return self._process_prop_odds(data, prop_type)
+            else:
+                return {"error": f"Failed to fetch prop odds: {response.status}"}
     
     async def _get_game_odds(self, sport: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Get odds for game outcomes."""
         sport_key = self._get_sport_key(sport)
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/sports/{sport_key}/odds",
-                params={
-                    'apiKey': self.api_key,
-                    'regions': 'us',
-                    'markets': 'h2h,spreads,totals',
-                    'bookmakers': ','.join(self.bookmakers)
-                }
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return self._process_game_odds(data, context)
-                else:
-                    return {"error": f"Failed to fetch game odds: {response.status}"}
+        session = self._get_session()
+        async with session.get(
+            f"{self.base_url}/sports/{sport_key}/odds",
+            params={
+                'apiKey': self.api_key,
+                'regions': 'us',
+                'markets': 'h2h,spreads,totals',
+                'bookmakers': self._BOOKMAKERS_CSV
+            }
+        ) as response:
+            if response.status == 200:
+                data = orjson.loads(await response.read())
+                return self._process_game_odds(data, context)
+            else:
+                return {"error": f"Failed to fetch game odds: {response.status}"}
     
     def _get_sport_key(self, sport: str) -> str:
         """Convert internal sport name to API sport key."""
-        sport_keys = {
-            'NFL': 'americanfootball_nfl',
-            'NBA': 'basketball_nba',
-            'MLB': 'baseball_mlb',
-            'NHL': 'icehockey_nhl',
-            'UFC': 'mma_mixed_martial_arts',
-            'Soccer': 'soccer_epl'  # Default to EPL, can be expanded
-        }
-        return sport_keys.get(sport, '')
+        return _SPORT_KEYS.get(sport, '')
     
     def _generate_cache_key(self, sport: str, context: Dict[str, Any]) -> str:
         """Generate cache key based on sport and context."""
@@ -99,36 +137,36 @@ class OddsClient:
     
     def _process_prop_odds(self, data: Dict[str, Any], prop_type: str) -> Dict[str, Any]:
         """Process raw prop odds data into standardized format."""
-        processed = {
-            'best_over': {'odds': -110, 'book': ''},
-            'best_under': {'odds': -110, 'book': ''},
+        prop_type = prop_type.lower()
+        markets = [
+            market for market in data.get('markets', [])
+            if market['market_type'].lower() == prop_type
+        ]
+        
+        # Collect (price, book) candidates, seeded with the -110 baseline
+        overs = [(-110, '')]
+        unders = [(-110, '')]
+        for market in markets:
+            for outcome in market['outcomes']:
+                name = outcome['name'].lower()
+                if 'over' in name:
+                    overs.append((outcome['price'], market['bookmaker']))
+                elif 'under' in name:
+                    unders.append((outcome['price'], market['bookmaker']))
+        
+        best_over = max(overs, key=self._odds_rank)
+        best_under = max(unders, key=self._odds_rank)
+        
+        return {
+            'best_over': {'odds': best_over[0], 'book': best_over[1]},
+            'best_under': {'odds': best_under[0], 'book': best_under[1]},
             'market_info': {
                 'last_update': datetime.now().isoformat(),
-                'num_books': 0,
+                'num_books': len(markets),
                 'consensus_line': 0,
                 'line_movement': []
             }
         }
-        
-        if 'markets' in data:
-            for market in data['markets']:
-                if market['market_type'].lower() == prop_type.lower():
-                    processed['market_info']['num_books'] += 1
-                    for outcome in market['outcomes']:
-                        if 'over' in outcome['name'].lower():
-                            if self._better_odds(outcome['price'], processed['best_over']['odds']):
-                                processed['best_over'] = {
-                                    'odds': outcome['price'],
-                                    'book': market['bookmaker']
-                                }
-                        elif 'under' in outcome['name'].lower():
-                            if self._better_odds(outcome['price'], processed['best_under']['odds']):
-                                processed['best_under'] = {
-                                    'odds': outcome['price'],
-                                    'book': market['bookmaker']
-                                }
-        
-        return processed
     
     def _process_game_odds(self, data: List[Dict[str, Any]], context: Dict[str, Any]) -> Dict[str, Any]:
         """Process raw game odds data into standardized format."""
@@ -143,25 +181,24 @@ class OddsClient:
             }
         }
         
-        for game in data:
-            if self._matches_context(game, context):
-                for bookmaker in game['bookmakers']:
-                    for market in bookmaker['markets']:
-                        self._update_best_odds(processed, market, bookmaker['key'])
-                break
+        # Lowercase the team once and stop at the first matching game
+        team = context.get('team', '').lower()
+        game = next(
+            (g for g in data
+             if team in g['home_team'].lower() or team in g['away_team'].lower()),
+            None
+        )
+        
+        if game is not None:
+            for bookmaker in game['bookmakers']:
+                book = bookmaker['key']
+                for market in bookmaker['markets']:
+                    self._update_best_odds(processed, market, book)
         
         return processed
     
-    def _better_odds(self, new_odds: float, current_odds: float) -> bool:
-        """Determine if new odds are better than current odds."""
-        if new_odds > 0 and current_odds > 0:
-            return new_odds > current_odds
-        if new_odds < 0 and current_odds < 0:
-            return new_odds > current_odds
-        return new_odds > 0  # Positive odds are better than negative
-    
-    def _matches_context(self, game: Dict[str, Any], context: Dict[str, Any]) -> bool:
-        """Check if game data matches the context we're looking for."""
-        team = context.get('team', '').lower()
-        return (team in game['home_team'].lower() or 
-                team in game['away_team'].lower()) 
\ No newline at end of file
+    @staticmethod
+    def _odds_rank(candidate: Tuple[float, str]) -> Tuple[bool, float]:
+        """Sort key for (price, book) pairs: positive odds beat negative, then higher wins."""
+        price = candidate[0]
+        return price > 0, price
\ No newline at end of file
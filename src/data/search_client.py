@@ -1,44 +1,137 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import asyncio
-from datetime import datetime, timedelta
+import aiohttp
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import hashlib
 import os
+import re
+import threading
 from bs4 import BeautifulSoup
 from googlesearch import search
 from newspaper import Article
 import feedparser
 import trafilatura
+from cachetools import TTLCache
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
-import spacy
+
+# Sentence boundary: whitespace following terminal punctuation
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+# Key phrase -> factor reported when an article mentions it
+_KEY_FACTOR_PHRASES = {
+    'injury': 'Injury concerns mentioned',
+    'injured': 'Injury concerns mentioned',
+    'weather': 'Weather could be a factor',
+    'streak': 'Team/Player on notable streak',
+    'line movement': 'Significant line movement reported',
+    'odds shift': 'Significant line movement reported'
+}
+# One named group per phrase, so a match maps back to its phrase without
+# lowercasing the matched text (case folding can turn it into a non-key)
+_KEY_FACTOR_GROUPS = {f'phrase{i}': factor for i, factor in enumerate(_KEY_FACTOR_PHRASES.values())}
+_KEY_FACTOR_PATTERN = re.compile(
+    '|'.join(f'(?P<phrase{i}>{re.escape(phrase)})' for i, phrase in enumerate(_KEY_FACTOR_PHRASES)),
+    re.IGNORECASE
+)
+_NUM_KEY_FACTORS = len(set(_KEY_FACTOR_PHRASES.values()))
+
+# Sentiment analyzer loaded once per worker process by _init_nlp_worker
+_worker_sentiment = None
+
+def _init_nlp_worker() -> None:
+    """Load VADER into a worker process."""
+    global _worker_sentiment
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        nltk.download('vader_lexicon', quiet=True)
+    _worker_sentiment = SentimentIntensityAnalyzer()
+
+def _analyze_contents(contents: List[str]) -> List[Dict[str, Any]]:
+    """Summarize and score a batch of articles inside a worker process."""
+    return [
+        {
+            'summary': ' '.join(_SENTENCE_BREAK.split(content, maxsplit=3)[:3]),
+            'sentiment': _worker_sentiment.polarity_scores(content)
+        }
+        for content in contents
+    ]
+
+# Shared by all SearchClient instances so VADER loads once per worker,
+# not once per client; created on first use by SearchClient._get_nlp_pool
+_nlp_pool: Optional[ProcessPoolExecutor] = None
+_NLP_WORKERS = max(2, (os.cpu_count() or 1) - 1)
+_nlp_pool_lock = threading.Lock()
 
 class SearchClient:
     """Client for gathering and analyzing web content related to sports betting."""
     
     def __init__(self):
-        # Initialize NLP components
-        nltk.download('vader_lexicon', quiet=True)
-        self.nlp = spacy.load('en_core_web_sm')
-        self.sentiment_analyzer = SentimentIntensityAnalyzer()
-        
         # Cache settings
-        self.cache = {}
-        self.cache_ttl = timedelta(hours=1)
+        self.cache = TTLCache(maxsize=512, ttl=3600)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
         
         # Search settings
         self.max_results = 10
         self.max_age_days = 2
         
+        # Size caps that bound extraction and NLP cost on oversized pages
+        self.max_html_bytes = 2_000_000
+        self.max_content_chars = 20_000
+    
+    @classmethod
+    def _get_nlp_pool(cls) -> ProcessPoolExecutor:
+        """Return the shared NLP worker pool, creating it on first use."""
+        global _nlp_pool
+        with _nlp_pool_lock:
+            if _nlp_pool is None:
+                # NLP runs in worker processes so articles are analyzed in parallel
+                _nlp_pool = ProcessPoolExecutor(
+                    max_workers=_NLP_WORKERS,
+                    initializer=_init_nlp_worker
+                )
+            return _nlp_pool
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=30),
+                headers={"User-Agent": "Mozilla/5.0"}
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        
     async def gather_insights(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Gather and analyze relevant web content."""
         cache_key = self._generate_cache_key(context)
         
         # Check cache
-        if cache_key in self.cache:
-            cache_time, data = self.cache[cache_key]
-            if datetime.now() - cache_time < self.cache_ttl:
-                return data
+        data = self.cache.get(cache_key)
+        if data is not None:
+            return data
+        
+        # Coalesce concurrent requests for the same key onto a single search
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_insights(context, cache_key))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return await asyncio.shield(task)
+    
+    async def _fetch_insights(self, context: Dict[str, Any], cache_key: str) -> Dict[str, Any]:
+        """Search all sources, analyze the results and cache them."""
+        # One timestamp shared by every article and the combined insights
+        now_iso = datetime.now().isoformat()
         
-        # Gather data from multiple sources
+        # Gather result URLs from multiple sources
         tasks = [
             self._search_news(context),
             self._search_expert_analysis(context),
@@ -46,56 +139,59 @@ class SearchClient:
             self._search_betting_trends(context)
         ]
         
-        results = await asyncio.gather(*tasks)
+        url_lists = await asyncio.gather(*tasks)
+        
+        # Searches often overlap, so download and analyze each URL only once
+        unique_urls = list(dict.fromkeys(url for urls in url_lists for url in urls))
+        contents = await asyncio.gather(*(self._extract_content(url) for url in unique_urls))
+        pages = [(url, content) for url, content in zip(unique_urls, contents) if content]
+        
+        try:
+            articles = {article['url']: article for article in await self._analyze_articles(pages, now_iso)}
+        except Exception as e:
+            print(f"Error analyzing articles: {e}")
+            articles = {}
+        
+        # Map articles back to the source that found them
+        results = [
+            [articles[url] for url in urls if url in articles]
+            for urls in url_lists
+        ]
         
         # Combine and analyze results
-        insights = self._analyze_results(results, context)
+        insights = self._analyze_results(results, context, now_iso)
         
         # Cache results
-        self.cache[cache_key] = (datetime.now(), insights)
+        self.cache[cache_key] = insights
         return insights
     
-    async def _search_news(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _search_news(self, context: Dict[str, Any]) -> List[str]:
         """Search for recent news articles."""
         query = self._build_news_query(context)
-        articles = []
+        urls = []
         
         try:
             # Search for news articles
-            search_results = search(query, num=self.max_results, stop=self.max_results)
-            
-            for url in search_results:
-                article = await self._extract_article(url)
-                if article:
-                    articles.append(article)
+            urls = await self._search_urls(query, self.max_results)
         except Exception as e:
             print(f"Error in news search: {e}")
         
-        return articles
+        return urls
     
-    async def _search_expert_analysis(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _search_expert_analysis(self, context: Dict[str, Any]) -> List[str]:
         """Search for expert analysis and predictions."""
         query = self._build_expert_query(context)
-        analyses = []
+        urls = []
         
         try:
             # Search sports analysis sites
-            search_results = search(
-                query,
-                num=self.max_results,
-                stop=self.max_results
-            )
-            
-            for url in search_results:
-                analysis = await self._extract_article(url)
-                if analysis:
-                    analyses.append(analysis)
+            urls = await self._search_urls(query, self.max_results)
         except Exception as e:
             print(f"Error in expert analysis search: {e}")
         
-        return analyses
+        return urls
     
-    async def _search_injury_updates(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _search_injury_updates(self, context: Dict[str, Any]) -> List[str]:
         """Search for injury reports and updates."""
         if 'player' in context:
             query = f"{context['player']} injury update {context.get('sport', '')}"
@@ -104,69 +200,92 @@ class SearchClient:
         else:
             return []
             
-        updates = []
+        urls = []
         
         try:
-            search_results = search(query, num=5, stop=5)
-            
-            for url in search_results:
-                update = await self._extract_article(url)
-                if update:
-                    updates.append(update)
+            urls = await self._search_urls(query, 5)
         except Exception as e:
             print(f"Error in injury updates search: {e}")
         
-        return updates
+        return urls
     
-    async def _search_betting_trends(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _search_betting_trends(self, context: Dict[str, Any]) -> List[str]:
         """Search for betting trends and line movements."""
         query = self._build_trends_query(context)
-        trends = []
+        urls = []
         
         try:
-            search_results = search(query, num=5, stop=5)
-            
-            for url in search_results:
-                trend = await self._extract_article(url)
-                if trend:
-                    trends.append(trend)
+            urls = await self._search_urls(query, 5)
         except Exception as e:
             print(f"Error in trends search: {e}")
         
-        return trends
+        return urls
+    
+    async def _search_urls(self, query: str, num: int) -> List[str]:
+        """Return result URLs for a web search query."""
+        # googlesearch is blocking, so run it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: list(search(query, num=num, stop=num)))
     
-    async def _extract_article(self, url: str) -> Optional[Dict[str, Any]]:
-        """Extract and analyze article content."""
+    async def _extract_content(self, url: str) -> Optional[str]:
+        """Download an article and extract its main text."""
         try:
             # Download and parse article
-            downloaded = trafilatura.fetch_url(url)
+            downloaded = await self._download(url)
             if not downloaded:
                 return None
                 
             content = trafilatura.extract(downloaded)
             if not content:
                 return None
-            
-            # Analyze content
-            doc = self.nlp(content)
-            sentiment = self.sentiment_analyzer.polarity_scores(content)
-            
-            return {
-                'url': url,
-                'content': content,
-                'summary': ' '.join([sent.text for sent in doc.sents][:3]),
-                'sentiment': sentiment,
-                'entities': [
-                    {'text': ent.text, 'label': ent.label_}
-                    for ent in doc.ents
-                    if ent.label_ in ['PERSON', 'ORG', 'GPE', 'DATE']
-                ],
-                'timestamp': datetime.now().isoformat()
-            }
+            return content[:self.max_content_chars]
         except Exception as e:
             print(f"Error extracting article {url}: {e}")
             return None
     
+    async def _analyze_articles(
+        self,
+        pages: List[Tuple[str, str]],
+        now_iso: str
+    ) -> List[Dict[str, Any]]:
+        """Run NLP over (url, content) pairs, split into one batch per pool worker."""
+        if not pages:
+            return []
+        
+        pool = self._get_nlp_pool()
+        contents = [content for _, content in pages]
+        batch_size = -(-len(contents) // _NLP_WORKERS)
+        loop = asyncio.get_running_loop()
+        batches = await asyncio.gather(*(
+            loop.run_in_executor(pool, _analyze_contents, contents[i:i + batch_size])
+            for i in range(0, len(contents), batch_size)
+        ))
+        analyses = [analysis for batch in batches for analysis in batch]
+        
+        return [
+            {
+                'url': url,
+                'content': content,
+                'summary': analysis['summary'],
+                'sentiment': analysis['sentiment'],
+                'timestamp': now_iso
+            }
+            for (url, content), analysis in zip(pages, analyses)
+        ]
+    
+    async def _download(self, url: str) -> Optional[bytes]:
+        """Download a page, stopping once it exceeds the HTML size cap."""
+        body = bytearray()
+        session = self._get_session()
+        async with session.get(url) as response:
+            if response.status != 200:
+                return None
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                body += chunk
+                if len(body) >= self.max_html_bytes:
+                    break
+        return bytes(body[:self.max_html_bytes])
+    
     def _build_news_query(self, context: Dict[str, Any]) -> str:
         """Build search query for news."""
         components = []
@@ -220,19 +339,29 @@ class SearchClient:
     def _analyze_results(
         self,
         results: List[List[Dict[str, Any]]],
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        now_iso: str
     ) -> Dict[str, Any]:
         """Analyze and combine search results."""
-        news, expert_analysis, injury_updates, trends = results
+        # One pass: aggregate sentiment and keep the leading summaries of
+        # news, expert analysis, injury updates and trends respectively
+        summaries = ([], [], [], [])
+        summary_limits = (3, 3, 2, 2)
+        sentiment_total = 0.0
+        sentiment_count = 0
         
-        # Aggregate sentiments
-        all_sentiments = []
-        for articles in results:
+        for articles, bucket, limit in zip(results, summaries, summary_limits):
             for article in articles:
-                if article and 'sentiment' in article:
-                    all_sentiments.append(article['sentiment']['compound'])
+                if not article:
+                    continue
+                if 'sentiment' in article:
+                    sentiment_total += article['sentiment']['compound']
+                    sentiment_count += 1
+                if 'summary' in article and len(bucket) < limit:
+                    bucket.append(article['summary'])
         
-        avg_sentiment = sum(all_sentiments) / len(all_sentiments) if all_sentiments else 0
+        avg_sentiment = sentiment_total / sentiment_count if sentiment_count else 0
+        news_summary, expert_opinions, injury_notes, betting_trends = summaries
         
         # Extract key insights
         insights = {
@@ -244,31 +373,19 @@ class SearchClient:
                     else 'Neutral'
                 )
             },
-            'news_summary': [
-                article['summary'] for article in news
-                if article and 'summary' in article
-            ][:3],
-            'expert_opinions': [
-                article['summary'] for article in expert_analysis
-                if article and 'summary' in article
-            ][:3],
-            'injury_notes': [
-                article['summary'] for article in injury_updates
-                if article and 'summary' in article
-            ][:2],
-            'betting_trends': [
-                article['summary'] for article in trends
-                if article and 'summary' in article
-            ][:2],
+            'news_summary': news_summary,
+            'expert_opinions': expert_opinions,
+            'injury_notes': injury_notes,
+            'betting_trends': betting_trends,
             'key_factors': self._extract_key_factors(results),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso
         }
         
         return insights
     
     def _extract_key_factors(self, results: List[List[Dict[str, Any]]]) -> List[str]:
         """Extract key factors from search results."""
-        factors = []
+        factors = {}  # Ordered set of factors found so far
         
         # Analyze all content for key insights
         for articles in results:
@@ -276,30 +393,24 @@ class SearchClient:
                 if not article or 'content' not in article:
                     continue
                     
-                # Look for key phrases
-                content = article['content'].lower()
-                
-                if 'injury' in content or 'injured' in content:
-                    factors.append('Injury concerns mentioned')
-                if 'weather' in content:
-                    factors.append('Weather could be a factor')
-                if 'streak' in content:
-                    factors.append('Team/Player on notable streak')
-                if 'line movement' in content or 'odds shift' in content:
-                    factors.append('Significant line movement reported')
+                # One pass over the content matches every key phrase
+                for match in _KEY_FACTOR_PATTERN.finditer(article['content']):
+                    factors[_KEY_FACTOR_GROUPS[match.lastgroup]] = None
+                    if len(factors) == _NUM_KEY_FACTORS:
+                        return list(factors)
                     
-        # Remove duplicates and return
-        return list(set(factors))
+        return list(factors)
     
     def _generate_cache_key(self, context: Dict[str, Any]) -> str:
-        """Generate cache key from context."""
-        components = []
+        """Generate a fixed-length cache key from context."""
+        digest = hashlib.blake2b(digest_size=16)
         
-        if 'player' in context:
-            components.append(f"player_{context['player']}")
-        if 'team' in context:
-            components.append(f"team_{context['team']}")
-        if 'sport' in context:
-            components.append(f"sport_{context['sport']}")
-            
-        return '_'.join(components) 
\ No newline at end of file
+        for field in ('player', 'team', 'sport'):
+            if field in context:
+                # Delimit fields so values containing separators cannot collide
+                digest.update(field.encode())
+                digest.update(b'\x00')
+                digest.update(str(context[field]).encode())
+                digest.update(b'\x01')
+                
+        return digest.hexdigest()
\ No newline at end of file
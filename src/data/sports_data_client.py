@@ -1,15 +1,90 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Awaitable
+import asyncio
 import aiohttp
-from datetime import datetime, timedelta
+import orjson
+from cachetools import TTLCache
+from datetime import datetime
 import os
 
+# Output key -> sportsdata.io field for the stats consumers actually use
+_PLAYER_FIELDS = {
+    'name': 'Name',
+    'team': 'Team',
+    'position': 'Position',
+    'games': 'Games',
+    'points': 'Points',
+    'rebounds': 'Rebounds',
+    'assists': 'Assists',
+    'passing_yards': 'PassingYards',
+    'rushing_yards': 'RushingYards',
+    'receiving_yards': 'ReceivingYards',
+    'touchdowns': 'Touchdowns',
+    'home_runs': 'HomeRuns',
+    'batting_average': 'BattingAverage',
+    'goals': 'Goals',
+    'wins': 'Wins',
+    'losses': 'Losses'
+}
+_TEAM_FIELDS = {
+    'name': 'Name',
+    'team': 'Team',
+    'games': 'Games',
+    'wins': 'Wins',
+    'losses': 'Losses',
+    'points': 'Points',
+    'points_allowed': 'OpponentPoints',
+    'score': 'Score',
+    'opponent_score': 'OpponentScore',
+    'runs': 'Runs',
+    'goals': 'Goals'
+}
+
+def _project(row: Dict[str, Any], fields: Dict[str, str]) -> Dict[str, Any]:
+    """Keep only the mapped fields that are present in an API row."""
+    return {key: row[field] for key, field in fields.items() if row.get(field) is not None}
+
 class SportsDataClient:
     """Client for fetching sports statistics and data."""
     
     def __init__(self):
         self.api_key = os.getenv('SPORTS_DATA_API_KEY')
         self.base_url = "https://api.sportsdata.io/v3"
-        self.cache = {}  # Simple in-memory cache
+        self.cache = TTLCache(maxsize=512, ttl=3600)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=50,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Ocp-Apim-Subscription-Key": self.api_key or ""}
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    async def _coalesced(
+        self,
+        cache_key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run fetch once per key, sharing its result with concurrent callers."""
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return await asyncio.shield(task)
         
     async def get_stats(self, sport: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Get relevant statistics based on sport and context."""
@@ -26,53 +101,57 @@ class SportsDataClient:
         cache_key = f"{sport}_{player}_stats"
         
         # Check cache first
-        if cache_key in self.cache:
-            cache_time, data = self.cache[cache_key]
-            if datetime.now() - cache_time < timedelta(hours=1):
-                return data
+        data = self.cache.get(cache_key)
+        if data is not None:
+            return data
         
+        return await self._coalesced(
+            cache_key, lambda: self._fetch_player_stats(sport, player, cache_key)
+        )
+    
+    async def _fetch_player_stats(self, sport: str, player: str, cache_key: str) -> Dict[str, Any]:
+        """Fetch player statistics from the API and cache them."""
         # Construct API endpoint based on sport
         endpoint = self._get_player_endpoint(sport, player)
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/{endpoint}",
-                headers={"Ocp-Apim-Subscription-Key": self.api_key}
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    processed_data = self._process_player_stats(sport, data)
-                    
-                    # Cache the results
-                    self.cache[cache_key] = (datetime.now(), processed_data)
-                    return processed_data
-                else:
-                    return {"error": f"Failed to fetch player stats: {response.status}"}
+        session = self._get_session()
+        async with session.get(f"{self.base_url}/{endpoint}") as response:
+            if response.status == 200:
+                data = orjson.loads(await response.read())
+                processed_data = self._process_player_stats(sport, data, player)
+                
+                # Cache the results
+                self.cache[cache_key] = processed_data
+                return processed_data
+            else:
+                return {"error": f"Failed to fetch player stats: {response.status}"}
     
     async def _get_team_stats(self, sport: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Get team statistics."""
         team = context['team']
         cache_key = f"{sport}_{team}_stats"
         
-        if cache_key in self.cache:
-            cache_time, data = self.cache[cache_key]
-            if datetime.now() - cache_time < timedelta(hours=1):
-                return data
+        data = self.cache.get(cache_key)
+        if data is not None:
+            return data
         
+        return await self._coalesced(
+            cache_key, lambda: self._fetch_team_stats(sport, team, cache_key)
+        )
+    
+    async def _fetch_team_stats(self, sport: str, team: str, cache_key: str) -> Dict[str, Any]:
+        """Fetch team statistics from the API and cache them."""
         endpoint = self._get_team_endpoint(sport, team)
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/{endpoint}",
-                headers={"Ocp-Apim-Subscription-Key": self.api_key}
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    processed_data = self._process_team_stats(sport, data)
-                    self.cache[cache_key] = (datetime.now(), processed_data)
-                    return processed_data
-                else:
-                    return {"error": f"Failed to fetch team stats: {response.status}"}
+        session = self._get_session()
+        async with session.get(f"{self.base_url}/{endpoint}") as response:
+            if response.status == 200:
+                data = orjson.loads(await response.read())
+                processed_data = self._process_team_stats(sport, data, team)
+                self.cache[cache_key] = processed_data
+                return processed_data
+            else:
+                return {"error": f"Failed to fetch team stats: {response.status}"}
     
     def _get_player_endpoint(self, sport: str, player: str) -> str:
         """Get the appropriate API endpoint for player stats."""
@@ -102,20 +181,39 @@ class SportsDataClient:
             return str(now.year - 1)
         return str(now.year)
     
-    def _process_player_stats(self, sport: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_player_stats(self, sport: str, data: Any, player: str) -> Dict[str, Any]:
         """Process raw player stats into standardized format."""
-        # Implementation would vary by sport
+        # Season endpoints return every player in the league; single-record
+        # endpoints (UFC fighters) return one dict
+        if isinstance(data, dict):
+            rows = [data]
+        else:
+            player_lower = player.lower()
+            rows = [p for p in data if player_lower in (p.get('Name') or '').lower()]
+        
+        players = []
+        for row in rows:
+            projected = _project(row, _PLAYER_FIELDS)
+            if 'name' not in projected:
+                projected['name'] = f"{row.get('FirstName', '')} {row.get('LastName', '')}".strip()
+            players.append(projected)
+        
         return {
-            'raw_data': data,
+            'players': players,
             'processed': True,
             'last_updated': datetime.now().isoformat()
         }
     
-    def _process_team_stats(self, sport: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_team_stats(self, sport: str, data: Any, team: str) -> Dict[str, Any]:
         """Process raw team stats into standardized format."""
-        # Implementation would vary by sport
+        rows = [data] if isinstance(data, dict) else data
+        team_lower = team.lower()
         return {
-            'raw_data': data,
+            'teams': [
+                _project(row, _TEAM_FIELDS) for row in rows
+                if team_lower in (row.get('Name') or '').lower()
+                or team_lower == (row.get('Team') or '').lower()
+            ],
             'processed': True,
             'last_updated': datetime.now().isoformat()
-        } 
\ No newline at end of file
+        }
@@ -1,15 +1,35 @@
 from typing import Dict, Any, Optional
+import asyncio
 import aiohttp
-from datetime import datetime, timedelta
+import orjson
+from cachetools import TTLCache
+import operator
 import os
 
+# (field, comparison, threshold, factor, recommendation) checks on current weather
+_WEATHER_RULES = (
+    ('temp_f', operator.lt, 32, 'freezing_temperatures',
+     'Cold weather may affect ball handling and kicking'),
+    ('temp_f', operator.gt, 90, 'extreme_heat',
+     'Heat may affect player stamina'),
+    ('wind_mph', operator.gt, 15, 'high_winds',
+     'Strong winds may affect passing and kicking game'),
+    ('precip_in', operator.gt, 0, 'precipitation',
+     'Wet conditions may affect ball handling')
+)
+
+# Overall rating by number of factors triggered (0, 1, 2+)
+_IMPACT_RATINGS = ('positive', 'neutral', 'negative')
+
 class WeatherClient:
     """Client for fetching weather data for outdoor sports."""
     
     def __init__(self):
         self.api_key = os.getenv('WEATHER_API_KEY')
         self.base_url = "https://api.weatherapi.com/v1"
-        self.cache = {}
+        self.cache = TTLCache(maxsize=512, ttl=3600)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
         
         # Stadium locations for outdoor sports
         self.stadium_locations = {
@@ -26,6 +46,30 @@ class WeatherClient:
                 # Add more MLB stadiums
             }
         }
+        
+        # Flat (sport, team) -> location index for single-probe lookups
+        self.stadiums = {
+            (sport, team): location
+            for sport, teams in self.stadium_locations.items()
+            for team, location in teams.items()
+        }
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=50,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
     
     async def get_forecast(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Get weather forecast for a game."""
@@ -36,46 +80,56 @@ class WeatherClient:
         cache_key = f"{location}_{context.get('game_time', 'today')}"
         
         # Check cache first
-        if cache_key in self.cache:
-            cache_time, data = self.cache[cache_key]
-            if datetime.now() - cache_time < timedelta(hours=1):
-                return data
+        data = self.cache.get(cache_key)
+        if data is not None:
+            return data
         
-        # Fetch weather data
+        # Coalesce concurrent requests for the same key onto a single fetch
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._fetch_and_cache_forecast(location, context, cache_key)
+            )
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return await asyncio.shield(task)
+    
+    async def _fetch_and_cache_forecast(
+        self,
+        location: str,
+        context: Dict[str, Any],
+        cache_key: str
+    ) -> Dict[str, Any]:
+        """Fetch weather data and cache the result."""
         forecast = await self._fetch_forecast(location, context)
-        
-        # Cache results
-        self.cache[cache_key] = (datetime.now(), forecast)
+        self.cache[cache_key] = forecast
         return forecast
     
     def _get_location(self, context: Dict[str, Any]) -> Optional[str]:
         """Determine location based on context."""
-        sport = context.get('sport', '')
-        if sport not in self.stadium_locations:
-            return None
-            
-        team = context.get('team', '').lower()
-        return self.stadium_locations[sport].get(team)
+        return self.stadiums.get(
+            (context.get('sport', ''), context.get('team', '').lower())
+        )
     
     async def _fetch_forecast(self, location: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Fetch weather forecast from API."""
         game_time = context.get('game_time', 'today')
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/forecast.json",
-                params={
-                    'key': self.api_key,
-                    'q': location,
-                    'days': 3,  # Get 3-day forecast to cover upcoming games
-                    'aqi': 'no'
-                }
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return self._process_forecast(data, game_time)
-                else:
-                    return {"error": f"Failed to fetch weather data: {response.status}"}
+        session = self._get_session()
+        async with session.get(
+            f"{self.base_url}/forecast.json",
+            params={
+                'key': self.api_key,
+                'q': location,
+                'days': 3,  # Get 3-day forecast to cover upcoming games
+                'aqi': 'no'
+            }
+        ) as response:
+            if response.status == 200:
+                data = orjson.loads(await response.read())
+                return self._process_forecast(data, game_time)
+            else:
+                return {"error": f"Failed to fetch weather data: {response.status}"}
     
     def _process_forecast(self, data: Dict[str, Any], game_time: str) -> Dict[str, Any]:
         """Process raw weather data into relevant format."""
@@ -108,34 +162,14 @@ class WeatherClient:
     
     def _assess_weather_impact(self, weather: Dict[str, Any]) -> Dict[str, Any]:
         """Assess potential impact of weather on the game."""
-        impact = {
-            'overall_rating': 'neutral',  # negative, neutral, positive
-            'factors': [],
-            'recommendations': []
-        }
+        triggered = [
+            (factor, recommendation)
+            for field, compare, threshold, factor, recommendation in _WEATHER_RULES
+            if compare(weather[field], threshold)
+        ]
         
-        # Temperature impact
-        if weather['temp_f'] < 32:
-            impact['factors'].append('freezing_temperatures')
-            impact['recommendations'].append('Cold weather may affect ball handling and kicking')
-        elif weather['temp_f'] > 90:
-            impact['factors'].append('extreme_heat')
-            impact['recommendations'].append('Heat may affect player stamina')
-            
-        # Wind impact
-        if weather['wind_mph'] > 15:
-            impact['factors'].append('high_winds')
-            impact['recommendations'].append('Strong winds may affect passing and kicking game')
-            
-        # Precipitation impact
-        if weather['precip_in'] > 0:
-            impact['factors'].append('precipitation')
-            impact['recommendations'].append('Wet conditions may affect ball handling')
-            
-        # Set overall rating
-        if len(impact['factors']) >= 2:
-            impact['overall_rating'] = 'negative'
-        elif len(impact['factors']) == 0:
-            impact['overall_rating'] = 'positive'
-            
-        return impact 
\ No newline at end of file
+        return {
+            'overall_rating': _IMPACT_RATINGS[min(len(triggered), 2)],
+            'factors': [factor for factor, _ in triggered],
+            'recommendations': [recommendation for _, recommendation in triggered]
+        }
\ No newline at end of file
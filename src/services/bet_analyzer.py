@@ -1,7 +1,14 @@
+import asyncio
+import hashlib
+import io
 import logging
-from typing import Dict, List
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Callable, Awaitable, AsyncIterator
 import aiohttp
-import json
+import numpy as np
+import orjson
+from cachetools import TTLCache
 from ..config import Config
 from ..clients import SportsDataClient
 import re
@@ -13,92 +20,13 @@ SPORTSDB_API_KEY = Config.SPORTSDB_API_KEY
 SPORTSDB_BASE_URL = Config.SPORTSDB_BASE_URL
 OPENAI_API_KEY = Config.OPENAI_API_KEY
 
-class BetAnalyzer:
-    """Analyzes bets using AI and sports data."""
-    
-    def __init__(self, llm):
-        """Initialize the bet analyzer."""
-        self.llm = llm
-        self.sports_client = SportsDataClient()
+# PLAYER|TEAM|BET_TYPE|LINE|ODDS lines returned by the bet extraction prompt
+_BET_LINE_RE = re.compile(
+    r'^\s*([^|]+?)\s*\|\s*([^|]+?)\s*\|\s*([^|]+?)\s*\|\s*([+-]?\d+(?:\.\d+)?)\s*\|\s*([+-]?\d+)\s*$'
+)
 
-    async def analyze_text(self, text: str) -> Dict:
-        """Analyze the bet slip text and return structured analysis."""
-        print("Starting analysis of text:")
-        print(text)
-        
-        # Extract bets
-        bets = await self._extract_bets(text)
-        
-        # Analyze each leg
-        leg_analyses = []
-        for bet in bets:
-            print(f"Analyzing bet: {bet}")
-            
-            if not bet['line'] or not bet['odds']:
-                continue
-            
-            # Get enhanced player/team context using LLM
-            try:
-                context = await self._process_player_context(bet)
-                risk_factors = context.get('risk_factors', [])
-                safety_factors = context.get('safety_factors', [])
-            except Exception as e:
-                print(f"Error processing context: {e}")
-                risk_factors = []
-                safety_factors = []
-                context = {}
-            
-            # Check odds
-            if bet['odds'] > 150:
-                risk_factors.append("High positive odds indicate significant upset needed")
-            elif bet['odds'] < -200:
-                risk_factors.append("Heavy favorite requires strong performance")
-            else:
-                safety_factors.append("Balanced odds suggest reasonable probability")
-            
-            # Check yardage lines with context
-            if bet['bet_type'] == 'Passing Yards':
-                if bet['line'] > context.get('avg_passing_yards', 250):
-                    risk_factors.append(f"Line {bet['line']} above player average {context.get('avg_passing_yards', 'N/A')}")
-                elif bet['line'] < context.get('avg_passing_yards', 250) * 0.8:
-                    safety_factors.append(f"Line {bet['line']} below player average {context.get('avg_passing_yards', 'N/A')}")
-            
-            elif bet['bet_type'] == 'Receiving Yards':
-                if bet['line'] > context.get('avg_receiving_yards', 60):
-                    risk_factors.append(f"Line {bet['line']} above player average {context.get('avg_receiving_yards', 'N/A')}")
-                elif bet['line'] < context.get('avg_receiving_yards', 60) * 0.8:
-                    safety_factors.append(f"Line {bet['line']} below player average {context.get('avg_receiving_yards', 'N/A')}")
-            
-            leg_analyses.append({
-                'player': bet['player'],
-                'bet_type': bet['bet_type'],
-                'line': bet['line'],
-                'odds': bet['odds'],
-                'is_risky': len(risk_factors) > len(safety_factors),
-                'is_safe': len(safety_factors) > len(risk_factors),
-                'risk_factors': risk_factors,
-                'safety_factors': safety_factors,
-                'context': context
-            })
-        
-        # Calculate overall analysis
-        if not leg_analyses:
-            raise ValueError("No valid bets found to analyze")
-        
-        risky_legs = sum(1 for leg in leg_analyses if leg['is_risky'])
-        safe_legs = sum(1 for leg in leg_analyses if leg['is_safe'])
-        
-        overall_risk = "High" if risky_legs > safe_legs else "Medium" if risky_legs == safe_legs else "Low"
-        
-        return {
-            'overall_risk': overall_risk,
-            'legs': leg_analyses,
-            'raw_text': text
-        }
-
-    async def _normalize_text(self, text: str) -> str:
-        """Use LLM to correct OCR errors and normalize text."""
-        prompt = f"""Analyze this sports betting text and extract ONLY the legs where you can identify with high confidence:
+# Prompt for _normalize_text
+_NORMALIZE_PROMPT_TMPL = """Analyze this sports betting text and extract ONLY the legs where you can identify with high confidence:
 1. A clear player name
 2. Their team
 3. The bet type (e.g. Passing Yards, Receiving Yards, etc.)
@@ -120,27 +48,8 @@ Rules:
 
 Return ONLY the bets you are completely confident about, one per line."""
 
-        try:
-            # Try different method names that might be available
-            for method_name in ['chat', 'generate', 'complete', '__call__']:
-                if hasattr(self.llm, method_name):
-                    response = await getattr(self.llm, method_name)(prompt)
-                    corrected_text = response.text if hasattr(response, 'text') else str(response)
-                    print(f"Normalized text:\n{corrected_text}")
-                    return corrected_text
-            
-            # If no method works, return original text
-            print("Warning: Could not find valid LLM method, using original text")
-            return text
-        except Exception as e:
-            print(f"Error in text normalization: {e}")
-            return text
-
-    async def _extract_bets(self, text: str) -> List[Dict]:
-        """Extract bets from OCR text using robust text processing."""
-        try:
-            # Use LLM to identify and extract bets
-            bet_prompt = f"""Analyze this betting slip and extract all valid bets.
+# Prompt for _extract_bets
+_EXTRACT_BETS_PROMPT_TMPL = """Analyze this betting slip and extract all valid bets.
 For each bet, you must be able to clearly identify ALL of these components:
 1. Player name (skip if unclear or ambiguous)
 2. Team
@@ -167,81 +76,8 @@ Jalen Hurts|PHI|Passing Yards|179|-186
 Only return bets where you are confident ALL components are present and clear.
 Return one bet per line with no additional text."""
 
-            try:
-                # Get LLM analysis
-                response = await self.llm._generate(bet_prompt)
-                llm_response = str(response)
-                print("LLM Response:", llm_response)
-
-                # Parse LLM response into bets
-                bets = []
-                for line in llm_response.split('\n'):
-                    line = line.strip()
-                    if not line or line.startswith('#') or line.lower().startswith('example'):
-                        continue
-                    
-                    try:
-                        # Parse bet components
-                        parts = line.split('|')
-                        if len(parts) == 5:
-                            player, team, bet_type, line_val, odds = [p.strip() for p in parts]
-                            
-                            # Convert numeric values
-                            try:
-                                line_val = float(line_val)
-                                odds = int(odds)
-                            except ValueError:
-                                print(f"Error converting numeric values in line: {line}")
-                                continue
-                            
-                            # Create bet dictionary
-                            bet = {
-                                'player': player,
-                                'team': team,
-                                'bet_type': bet_type,
-                                'line': line_val,
-                                'odds': odds
-                            }
-                            
-                            # Validate bet values based on type
-                            if bet['bet_type'] == 'Passing Yards' and not (150 <= bet['line'] <= 400):
-                                print(f"Skipping {player} - passing yards line {line_val} outside valid range")
-                                continue
-                            if bet['bet_type'] == 'Receiving Yards' and not (20 <= bet['line'] <= 150):
-                                print(f"Skipping {player} - receiving yards line {line_val} outside valid range")
-                                continue
-                            if not (-500 <= bet['odds'] <= 500):
-                                print(f"Skipping {player} - odds {odds} outside valid range")
-                                continue
-                            
-                            print(f"Adding complete bet for {player}: {bet_type} {line_val} @ {odds}")
-                            bets.append(bet)
-                            
-                    except Exception as e:
-                        print(f"Error parsing bet line '{line}': {e}")
-                        continue
-
-                # Print extracted bets for debugging
-                print("\nExtracted bets:")
-                for bet in bets:
-                    print(json.dumps(bet, indent=2))
-                
-                return bets
-                
-            except Exception as e:
-                print(f"Error in LLM analysis: {e}")
-                return []
-            
-        except Exception as e:
-            print(f"Error in bet extraction: {e}")
-            return []
-
-    async def _validate_bets(self, bets: List[Dict]) -> List[Dict]:
-        """Use LLM to validate and correct extracted bets."""
-        if not bets:
-            return bets
-
-        prompt = f"""Validate and correct these extracted bets, ensuring all 4 players (Matthew Stafford, Jalen Hurts, Cooper Kupp, AJ Brown) are included if present in original text. Check for:
+# Prompt for _validate_bets
+_VALIDATE_BETS_PROMPT_TMPL = """Validate and correct these extracted bets, ensuring all 4 players (Matthew Stafford, Jalen Hurts, Cooper Kupp, AJ Brown) are included if present in original text. Check for:
 1. Player name accuracy
 2. Team affiliations (LAR or PHI)
 3. Reasonable lines for bet types
@@ -249,7 +85,7 @@ Return one bet per line with no additional text."""
 5. Missing bets that should be included
 
 Extracted bets:
-{json.dumps(bets, indent=2)}
+{bets_json}
 
 Return the corrected bets in the same JSON format, fixing any errors while maintaining the structure.
 Known valid ranges:
@@ -263,16 +99,335 @@ Expected players:
 - Cooper Kupp (LAR) - Receiving Yards
 - AJ Brown (PHI) - Receiving Yards"""
 
+# Per-bet user message for _get_ai_analysis
+_ANALYSIS_PROMPT_TMPL = """Player Information:
+{player_json}
+
+Team Information:
+{team_json}
+
+Bet Details:
+- Type: {bet_type}
+- Odds: {odds}"""
+
+# Per-bet user message for _process_player_context
+_PLAYER_CONTEXT_PROMPT_TMPL = """Player: {player}
+Team: {team}
+Bet Type: {bet_type}
+Line: {line}
+Odds: {odds}
+
+Player Stats:
+{player_json}
+
+Team Context:
+{team_json}
+"""
+
+# Fixed LLM instructions, sent as system messages ahead of the per-bet data
+# so the prompt prefix stays byte-identical between calls
+_PLAYER_CONTEXT_SYSTEM_PROMPT = """Analyze the given player and their team's context for the given bet.
+
+Provide analysis in JSON format with:
+1. Recent performance metrics
+2. Risk factors
+3. Safety factors
+4. Relevant averages
+5. Team context impact
+"""
+
+_BET_ANALYSIS_SYSTEM_PROMPT = """Analyze sports bets based on the context provided.
+
+Please provide a detailed analysis in JSON format with the following structure:
+{
+    "risk_level": "low/medium/high",
+    "confidence": 0-100,
+    "reasoning": ["reason1", "reason2", ...],
+    "team_context": {
+        "matchup_analysis": "string",
+        "recent_performance": "string"
+    },
+    "recommendations": ["rec1", "rec2", ...]
+}
+
+Focus on recent performance, injury status, team dynamics, and historical data to assess the bet's risk and potential value."""
+
+# (kind, message) per bucket for _calculate_overall_analysis; bisect_right over
+# the bounds picks the bucket. Odds are ints, so 'odds > 150' starts at 151; a
+# line's upper bound belongs to the moderate bucket and is checked explicitly
+_ODDS_BOUNDS = (-200, -150, 151)
+_ODDS_FACTORS = (
+    ('risk', "Heavy favorite ({}) but needs high performance"),
+    None,
+    ('safety', "Balanced odds ({}) suggest reasonable probability"),
+    ('risk', "High odds (+{}) indicate significant upset needed")
+)
+_LINE_FACTORS = (
+    ('Passing Yards', ((200, 280), (
+        ('risk', "Low passing yards line ({}) vulnerable to run-heavy gameplan"),
+        ('safety', "Moderate passing yards line ({}) within typical range"),
+        ('risk', "High passing yards line ({}) requires exceptional performance")
+    ))),
+    ('Receiving Yards', ((40, 80), (
+        ('risk', "Low receiving yards line ({}) could still miss with limited opportunities"),
+        ('safety', "Moderate receiving yards line ({}) within typical range"),
+        ('risk', "High receiving yards line ({}) requires consistent targets")
+    )))
+)
+
+# Player average used to judge each yardage bet type's line
+_BET_TYPE_CFG = {
+    'Passing Yards': {'avg_key': 'avg_passing_yards', 'stat_key': 'passing_yards', 'default': 250.0},
+    'Receiving Yards': {'avg_key': 'avg_receiving_yards', 'stat_key': 'receiving_yards', 'default': 60.0}
+}
+
+# Valid line ranges per bet type
+_BET_RANGES = {
+    'Passing Yards': (150.0, 400.0),
+    'Receiving Yards': (20.0, 150.0)
+}
+_ANY_LINE = (float('-inf'), float('inf'))
+_ODDS_RANGE = (-500, 500)
+
+class BetAnalyzer:
+    """Analyzes bets using AI and sports data."""
+    
+    def __init__(self, llm):
+        """Initialize the bet analyzer."""
+        self.llm = llm
+        self.sports_client = SportsDataClient()
+        # Resolve the LLM's completion method once instead of probing per call
+        self._llm_call = next(
+            (getattr(llm, name) for name in ('chat', 'generate', 'complete', '__call__')
+             if hasattr(llm, name)),
+            None
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Caps concurrent per-leg LLM calls
+        self._leg_semaphore = asyncio.Semaphore(8)
+        # Prompt digest -> LLM response text for recently seen prompts
+        self._llm_cache = TTLCache(maxsize=1024, ttl=600)
+        # SportsDB player/team lookups, fresh for 15 minutes
+        self._lookup_cache = TTLCache(maxsize=4096, ttl=900)
+        self._inflight: Dict[Tuple[str, ...], asyncio.Future] = {}
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared SportsDB HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    async def _generate_cached(self, prompt: str, generate, system: Optional[str] = None) -> str:
+        """Return the LLM response text for a prompt, reusing identical recent prompts."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update((system or '').encode())
+        digest.update(b'\x00')
+        digest.update(prompt.encode())
+        key = digest.hexdigest()
+        response_text = self._llm_cache.get(key)
+        if response_text is None:
+            if system is None:
+                response = await generate(prompt)
+            else:
+                response = await generate(prompt, system=system)
+            response_text = response.text if hasattr(response, 'text') else str(response)
+            self._llm_cache[key] = response_text
+        return response_text
+
+    async def analyze_text(self, text: str) -> Dict:
+        """Analyze the bet slip text and return structured analysis."""
+        logger.debug("Starting analysis of text:\n%s", text)
+        
+        # Legs are independent, so start analyzing each one as soon as its
+        # bet is extracted and let them run concurrently
+        tasks = []
+        try:
+            async for bet in self._extract_bets(text):
+                if bet['line'] and bet['odds']:
+                    tasks.append(asyncio.ensure_future(self._analyze_one_leg(bet)))
+        except BaseException:
+            # Don't leave already-started legs running unobserved
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Collect successful legs and tally risky/safe ones in the same pass
+        leg_analyses = []
+        risky_legs = safe_legs = 0
+        for leg in results:
+            if isinstance(leg, BaseException):
+                logger.warning("Leg analysis failed", exc_info=leg)
+                continue
+            leg_analyses.append(leg)
+            risky_legs += leg['is_risky']
+            safe_legs += leg['is_safe']
+        
+        # Calculate overall analysis
+        if not leg_analyses:
+            raise ValueError("No valid bets found to analyze")
+        
+        overall_risk = "High" if risky_legs > safe_legs else "Medium" if risky_legs == safe_legs else "Low"
+        
+        return {
+            'overall_risk': overall_risk,
+            'legs': leg_analyses,
+            'raw_text': text
+        }
+    
+    async def _analyze_one_leg(self, bet: Dict) -> Dict:
+        """Analyze a single extracted bet leg."""
+        logger.debug("Analyzing bet: %s", bet)
+        
+        # Get enhanced player/team context using LLM
+        try:
+            async with self._leg_semaphore:
+                context = await self._process_player_context(bet)
+            risk_factors = context.get('risk_factors', [])
+            safety_factors = context.get('safety_factors', [])
+        except Exception as e:
+            logger.error("Error processing context: %s", e)
+            risk_factors = []
+            safety_factors = []
+            context = {}
+        
+        # Check odds
+        if bet['odds'] > 150:
+            risk_factors.append("High positive odds indicate significant upset needed")
+        elif bet['odds'] < -200:
+            risk_factors.append("Heavy favorite requires strong performance")
+        else:
+            safety_factors.append("Balanced odds suggest reasonable probability")
+        
+        # Check yardage lines with context
+        cfg = _BET_TYPE_CFG.get(bet['bet_type'])
+        if cfg:
+            avg = context.get(cfg['avg_key'], cfg['default'])
+            if bet['line'] > avg:
+                risk_factors.append(f"Line {bet['line']} above player average {context.get(cfg['avg_key'], 'N/A')}")
+            elif bet['line'] < avg * 0.8:
+                safety_factors.append(f"Line {bet['line']} below player average {context.get(cfg['avg_key'], 'N/A')}")
+        
+        return {
+            'player': bet['player'],
+            'bet_type': bet['bet_type'],
+            'line': bet['line'],
+            'odds': bet['odds'],
+            'is_risky': len(risk_factors) > len(safety_factors),
+            'is_safe': len(safety_factors) > len(risk_factors),
+            'risk_factors': risk_factors,
+            'safety_factors': safety_factors,
+            'context': context
+        }
+
+    async def _normalize_text(self, text: str) -> str:
+        """Use LLM to correct OCR errors and normalize text."""
+        prompt = _NORMALIZE_PROMPT_TMPL.format(text=text)
+
+        try:
+            if self._llm_call is None:
+                logger.warning("Could not find valid LLM method, using original text")
+                return text
+            
+            response = await self._llm_call(prompt)
+            corrected_text = response.text if hasattr(response, 'text') else str(response)
+            logger.debug("Normalized text:\n%s", corrected_text)
+            return corrected_text
+        except Exception as e:
+            logger.error("Error in text normalization: %s", e)
+            return text
+
+    async def _extract_bets(self, text: str) -> AsyncIterator[Dict]:
+        """Extract bets from OCR text, yielding each one as soon as its line is parsed."""
+        # Use LLM to identify and extract bets
+        bet_prompt = _EXTRACT_BETS_PROMPT_TMPL.format(text=text)
+
+        try:
+            async for line in self._llm_response_lines(bet_prompt):
+                bet = self._parse_bet_line(line)
+                if bet is not None:
+                    yield bet
+        except Exception as e:
+            logger.error("Error in bet extraction: %s", e)
+
+    async def _llm_response_lines(self, prompt: str) -> AsyncIterator[str]:
+        """Yield LLM response lines, streaming them when the LLM supports it."""
+        astream = getattr(self.llm, 'astream', None)
+        if astream is None:
+            llm_response = await self._generate_cached(prompt, self.llm._generate)
+            logger.debug("LLM Response: %s", llm_response)
+            for line in io.StringIO(llm_response):
+                yield line
+            return
+        
+        buffer = ''
+        async for chunk in astream(prompt):
+            buffer += chunk if isinstance(chunk, str) else getattr(chunk, 'text', str(chunk))
+            newline = buffer.find('\n')
+            while newline != -1:
+                yield buffer[:newline]
+                buffer = buffer[newline + 1:]
+                newline = buffer.find('\n')
+        if buffer:
+            yield buffer
+
+    def _parse_bet_line(self, line: str) -> Optional[Dict]:
+        """Parse one PLAYER|TEAM|TYPE|LINE|ODDS line into a validated bet."""
+        # Anything not shaped like PLAYER|TEAM|TYPE|LINE|ODDS is skipped
+        bet_match = _BET_LINE_RE.match(line)
+        if not bet_match:
+            return None
+        
+        player, team, bet_type, line_val, odds = bet_match.groups()
+        if player.startswith('#') or player.lower().startswith('example'):
+            return None
+        line_val = float(line_val)
+        odds = int(odds)
+        
+        # Validate line (per bet type) and odds in a single check
+        low, high = _BET_RANGES.get(bet_type, _ANY_LINE)
+        odds_low, odds_high = _ODDS_RANGE
+        if not (low <= line_val <= high and odds_low <= odds <= odds_high):
+            logger.debug("Skipping %s - %s line %s or odds %s outside valid range", player, bet_type, line_val, odds)
+            return None
+        
+        logger.debug("Adding complete bet for %s: %s %s @ %s", player, bet_type, line_val, odds)
+        return {
+            'player': player,
+            'team': team,
+            'bet_type': bet_type,
+            'line': line_val,
+            'odds': odds
+        }
+
+    async def _validate_bets(self, bets: List[Dict]) -> List[Dict]:
+        """Use LLM to validate and correct extracted bets."""
+        if not bets:
+            return bets
+
+        prompt = _VALIDATE_BETS_PROMPT_TMPL.format(bets_json=orjson.dumps(bets).decode())
+
         try:
             response = await self.llm.generate(prompt)
             response_text = response.text if hasattr(response, 'text') else str(response)
             try:
-                return json.loads(response_text)
-            except json.JSONDecodeError:
-                print("Failed to parse LLM response as JSON")
+                return orjson.loads(response_text)
+            except orjson.JSONDecodeError:
+                logger.warning("Failed to parse LLM response as JSON")
                 return bets
         except Exception as e:
-            print(f"Error in bet validation: {e}")
+            logger.error("Error in bet validation: %s", e)
             return bets
 
     def _get_sports_data(self, bet: Dict) -> Dict:
@@ -294,7 +449,7 @@ Expected players:
             return data
             
         except Exception as e:
-            print(f"Error getting sports data: {str(e)}")
+            logger.error("Error getting sports data: %s", e)
             return {}
 
     def _calculate_overall_analysis(self, legs: List[Dict]) -> Dict:
@@ -313,31 +468,24 @@ Expected players:
                 line = float(leg.get('line', 0))
                 bet_type = leg.get('bet_type', '')
                 
-                # Check odds-based factors
-                if odds > 150:
-                    risk_factors.append(f"High odds (+{odds}) indicate significant upset needed")
-                elif odds < -200:
-                    risk_factors.append(f"Heavy favorite ({odds}) but needs high performance")
-                elif -150 <= odds <= 150:
-                    safety_factors.append(f"Balanced odds ({odds}) suggest reasonable probability")
+                factors = {'risk': risk_factors, 'safety': safety_factors}
                 
-                # Check line-based factors for Passing Yards
-                if 'Passing Yards' in bet_type:
-                    if line > 280:
-                        risk_factors.append(f"High passing yards line ({line}) requires exceptional performance")
-                    elif line < 200:
-                        risk_factors.append(f"Low passing yards line ({line}) vulnerable to run-heavy gameplan")
-                    else:
-                        safety_factors.append(f"Moderate passing yards line ({line}) within typical range")
+                # Check odds-based factors
+                factor = _ODDS_FACTORS[bisect_right(_ODDS_BOUNDS, odds)]
+                if factor:
+                    factors[factor[0]].append(factor[1].format(odds))
                 
-                # Check line-based factors for Receiving Yards
-                elif 'Receiving Yards' in bet_type:
-                    if line > 80:
-                        risk_factors.append(f"High receiving yards line ({line}) requires consistent targets")
-                    elif line < 40:
-                        risk_factors.append(f"Low receiving yards line ({line}) could still miss with limited opportunities")
-                    else:
-                        safety_factors.append(f"Moderate receiving yards line ({line}) within typical range")
+                # Check line-based factors for yardage props
+                line_table = next(
+                    (table for name, table in _LINE_FACTORS if name in bet_type), None
+                )
+                if line_table:
+                    bounds, entries = line_table
+                    index = bisect_right(bounds, line)
+                    if line == bounds[-1]:
+                        index -= 1
+                    kind, message = entries[index]
+                    factors[kind].append(message.format(line))
                 
                 # Determine if the leg is safe or risky
                 is_safe = len(safety_factors) > 0 and len(risk_factors) == 0
@@ -410,7 +558,7 @@ Expected players:
             }
             
         except Exception as e:
-            print(f"Error calculating overall analysis: {str(e)}")
+            logger.error("Error calculating overall analysis: %s", e)
             return {}
 
     async def _analyze_single_bet(self, bet_text: str) -> Dict:
@@ -423,11 +571,12 @@ Expected players:
                 'format': 'raw_text'
             }
             
-            # Gather data from various sources
-            sports_data = await self.sports_client.get_stats(context.get('sport', ''), context)
-            
-            # Get AI analysis
-            analysis = await self.llm.analyze_bet(context)
+            # Sports data and AI analysis both work from the same context,
+            # so fetch them concurrently
+            sports_data, analysis = await asyncio.gather(
+                self.sports_client.get_stats(context.get('sport', ''), context),
+                self.llm.analyze_bet(context)
+            )
             
             return {
                 'bet_text': bet_text,
@@ -440,7 +589,7 @@ Expected players:
             }
             
         except Exception as e:
-            print(f"Error analyzing single bet: {str(e)}")
+            logger.error("Error analyzing single bet: %s", e)
             return {
                 'bet_text': bet_text,
                 'error': str(e)
@@ -455,15 +604,16 @@ Expected players:
             
             # Determine overall risk level
             risk_levels = [leg.get('risk_level', 'Unknown') for leg in leg_analyses]
-            overall_risk = max(risk_levels, key=risk_levels.count) if risk_levels else 'Unknown'
+            overall_risk = Counter(risk_levels).most_common(1)[0][0] if risk_levels else 'Unknown'
             
             # Combine key factors
             all_factors = []
+            extend_factors = all_factors.extend
             for leg in leg_analyses:
-                all_factors.extend(leg.get('key_factors', []))
+                extend_factors(leg.get('key_factors', ()))
             
-            # Get unique factors
-            key_factors = list(set(all_factors))
+            # Get unique factors, keeping first-seen order
+            key_factors = list(dict.fromkeys(all_factors))
             
             return {
                 'confidence': round(avg_confidence, 1),
@@ -478,94 +628,123 @@ Expected players:
             }
             
         except Exception as e:
-            print(f"Error in overall analysis: {str(e)}")
+            logger.error("Error in overall analysis: %s", e)
             return {
                 'error': str(e)
             }
     
+    async def _cached_lookup(self, key: Tuple[str, ...], fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        """Return a cached SportsDB lookup, sharing one request among concurrent callers."""
+        data = self._lookup_cache.get(key)
+        if data is not None:
+            return data
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        data = await asyncio.shield(task)
+        self._lookup_cache[key] = data
+        return data
+    
     async def _get_player_data(self, player_name: str, team: str) -> Dict:
         """Get player data from SportsDB API."""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/{self.sportsdb_api_key}/searchplayers.php"
-                params = {'p': player_name}
-                
-                async with session.get(url, params=params) as response:
-                    data = await response.json()
-                    
-                    if not data.get('player'):
-                        return {'name': player_name, 'team': team, 'recent_stats': {}}
-                    
-                    player = data['player'][0]
-                    return {
-                        'name': player['strPlayer'],
-                        'team': team,
-                        'position': player.get('strPosition'),
-                        'nationality': player.get('strNationality'),
-                        'recent_stats': await self._get_player_stats(player['idPlayer'])
-                    }
-                    
+            return await self._cached_lookup(
+                ('player', player_name, team),
+                lambda: self._fetch_player_data(player_name, team)
+            )
         except Exception as e:
             logger.error(f"Error getting player data: {str(e)}", exc_info=True)
             return {'name': player_name, 'team': team, 'recent_stats': {}}
     
+    async def _fetch_player_data(self, player_name: str, team: str) -> Dict:
+        """Fetch player data from SportsDB API."""
+        session = self._get_session()
+        url = f"{self.base_url}/{self.sportsdb_api_key}/searchplayers.php"
+        params = {'p': player_name}
+        
+        async with session.get(url, params=params) as response:
+            data = await response.json()
+            
+            if not data.get('player'):
+                return {'name': player_name, 'team': team, 'recent_stats': {}}
+            
+            player = data['player'][0]
+            return {
+                'name': player['strPlayer'],
+                'team': team,
+                'position': player.get('strPosition'),
+                'nationality': player.get('strNationality'),
+                'recent_stats': await self._get_player_stats(player['idPlayer'])
+            }
+    
     async def _get_team_data(self, team: str) -> Dict:
         """Get team data from SportsDB API."""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/{self.sportsdb_api_key}/searchteams.php"
-                params = {'t': team}
-                
-                async with session.get(url, params=params) as response:
-                    data = await response.json()
-                    
-                    if not data.get('teams'):
-                        return {'name': team}
-                    
-                    team_data = data['teams'][0]
-                    return {
-                        'name': team_data['strTeam'],
-                        'league': team_data.get('strLeague'),
-                        'stadium': team_data.get('strStadium'),
-                        'description': team_data.get('strDescriptionEN')
-                    }
-                    
+            return await self._cached_lookup(('team', team), lambda: self._fetch_team_data(team))
         except Exception as e:
             logger.error(f"Error getting team data: {str(e)}", exc_info=True)
             return {'name': team}
     
+    async def _fetch_team_data(self, team: str) -> Dict:
+        """Fetch team data from SportsDB API."""
+        session = self._get_session()
+        url = f"{self.base_url}/{self.sportsdb_api_key}/searchteams.php"
+        params = {'t': team}
+        
+        async with session.get(url, params=params) as response:
+            data = await response.json()
+            
+            if not data.get('teams'):
+                return {'name': team}
+            
+            team_data = data['teams'][0]
+            return {
+                'name': team_data['strTeam'],
+                'league': team_data.get('strLeague'),
+                'stadium': team_data.get('strStadium'),
+                'description': team_data.get('strDescriptionEN')
+            }
+    
     async def _get_player_stats(self, player_id: str) -> Dict:
         """Get player's recent statistics."""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/{self.sportsdb_api_key}/lookupplayer.php"
-                params = {'id': player_id}
-                
-                async with session.get(url, params=params) as response:
-                    data = await response.json()
-                    
-                    if not data.get('players'):
-                        return {}
-                    
-                    stats = data['players'][0]
-                    return {
-                        'recent_form': stats.get('strStatus'),
-                        'injury_status': stats.get('strInjured'),
-                        'last_game': stats.get('strLastGame')
-                    }
-                    
+            return await self._cached_lookup(
+                ('player_stats', player_id), lambda: self._fetch_player_stats(player_id)
+            )
         except Exception as e:
             logger.error(f"Error getting player stats: {str(e)}", exc_info=True)
             return {}
     
+    async def _fetch_player_stats(self, player_id: str) -> Dict:
+        """Fetch player's recent statistics from SportsDB API."""
+        session = self._get_session()
+        url = f"{self.base_url}/{self.sportsdb_api_key}/lookupplayer.php"
+        params = {'id': player_id}
+        
+        async with session.get(url, params=params) as response:
+            data = await response.json()
+            
+            if not data.get('players'):
+                return {}
+            
+            stats = data['players'][0]
+            return {
+                'recent_form': stats.get('strStatus'),
+                'injury_status': stats.get('strInjured'),
+                'last_game': stats.get('strLastGame')
+            }
+    
     async def _get_ai_analysis(self, context: Dict) -> Dict:
         """Get AI analysis of the bet based on available data."""
         try:
             prompt = self._create_analysis_prompt(context)
-            response = await self.llm.generate(prompt)
+            response = await self.llm.generate(prompt, system=_BET_ANALYSIS_SYSTEM_PROMPT)
             
             # Parse AI response
-            analysis = json.loads(response)
+            analysis = orjson.loads(response)
             
             return {
                 'risk_level': analysis.get('risk_level', 'medium'),
@@ -587,82 +766,62 @@ Expected players:
     
     def _create_analysis_prompt(self, context: Dict) -> str:
         """Create a prompt for AI analysis."""
-        return f"""Analyze this sports bet based on the following context:
-
-Player Information:
-{json.dumps(context['player'], indent=2)}
-
-Team Information:
-{json.dumps(context['team'], indent=2)}
-
-Bet Details:
-- Type: {context['bet_type']}
-- Odds: {context['odds']}
-
-Please provide a detailed analysis in JSON format with the following structure:
-{{
-    "risk_level": "low/medium/high",
-    "confidence": 0-100,
-    "reasoning": ["reason1", "reason2", ...],
-    "team_context": {{
-        "matchup_analysis": "string",
-        "recent_performance": "string"
-    }},
-    "recommendations": ["rec1", "rec2", ...]
-}}
-
-Focus on recent performance, injury status, team dynamics, and historical data to assess the bet's risk and potential value.""" 
+        return _ANALYSIS_PROMPT_TMPL.format(
+            player_json=orjson.dumps(context['player']).decode(),
+            team_json=orjson.dumps(context['team']).decode(),
+            bet_type=context['bet_type'],
+            odds=context['odds']
+        )
 
     async def _process_player_context(self, bet: Dict) -> Dict:
         """Process player and team context using LLM."""
         try:
-            # Get raw stats
-            player_data = await self.sports_client.get_player_stats(bet['player'])
-            team_data = await self.sports_client.get_team_stats(bet['team'])
+            # Get raw stats; the two lookups are independent
+            player_data, team_data = await asyncio.gather(
+                self.sports_client.get_player_stats(bet['player']),
+                self.sports_client.get_team_stats(bet['team']),
+                return_exceptions=True
+            )
+            if isinstance(player_data, Exception):
+                logger.error("Error getting player stats: %s", player_data)
+                player_data = {}
+            if isinstance(team_data, Exception):
+                logger.error("Error getting team stats: %s", team_data)
+                team_data = {}
             
             # Create context for LLM
-            prompt = f"""Analyze this player and their team's context for a {bet['bet_type']} bet:
-
-Player: {bet['player']}
-Team: {bet['team']}
-Bet Type: {bet['bet_type']}
-Line: {bet['line']}
-Odds: {bet['odds']}
-
-Player Stats:
-{json.dumps(player_data, indent=2)}
-
-Team Context:
-{json.dumps(team_data, indent=2)}
-
-Provide analysis in JSON format with:
-1. Recent performance metrics
-2. Risk factors
-3. Safety factors
-4. Relevant averages
-5. Team context impact
-"""
+            prompt = _PLAYER_CONTEXT_PROMPT_TMPL.format(
+                player=bet['player'],
+                team=bet['team'],
+                bet_type=bet['bet_type'],
+                line=bet['line'],
+                odds=bet['odds'],
+                player_json=orjson.dumps(player_data).decode(),
+                team_json=orjson.dumps(team_data).decode()
+            )
             
             # Get LLM analysis
-            response = await self.llm.generate(prompt)
-            response_text = response.text if hasattr(response, 'text') else str(response)
+            response_text = await self._generate_cached(
+                prompt, self.llm.generate, system=_PLAYER_CONTEXT_SYSTEM_PROMPT
+            )
             
             try:
-                context = json.loads(response_text)
-            except json.JSONDecodeError:
-                print("Failed to parse LLM response as JSON")
+                context = orjson.loads(response_text)
+            except orjson.JSONDecodeError:
+                logger.warning("Failed to parse LLM response as JSON")
                 context = {}
             
             # Add computed averages if not provided by LLM
-            if bet['bet_type'] == 'Passing Yards' and 'avg_passing_yards' not in context:
-                context['avg_passing_yards'] = self._calculate_average(player_data, 'passing_yards', default=250)
-            elif bet['bet_type'] == 'Receiving Yards' and 'avg_receiving_yards' not in context:
-                context['avg_receiving_yards'] = self._calculate_average(player_data, 'receiving_yards', default=60)
+            cfg = _BET_TYPE_CFG.get(bet['bet_type'])
+            if cfg and cfg['avg_key'] not in context:
+                context[cfg['avg_key']] = self._calculate_average(
+                    player_data, cfg['stat_key'], default=cfg['default']
+                )
             
             return context
             
         except Exception as e:
-            print(f"Error in player context processing: {e}")
+            logger.error("Error in player context processing: %s", e)
             return {}
             
     def _calculate_average(self, stats: Dict, stat_key: str, default: float = 0) -> float:
@@ -671,10 +830,10 @@ Provide analysis in JSON format with:
             if not stats or stat_key not in stats:
                 return default
                 
-            values = [float(v) for v in stats[stat_key] if v]
-            if not values:
+            values = np.fromiter((float(v) for v in stats[stat_key] if v), dtype=np.float64)
+            if not values.size:
                 return default
                 
-            return sum(values) / len(values)
+            return float(values.mean())
         except:
             return default 
\ No newline at end of file
@@ -1,32 +1,111 @@
 import logging
+import threading
 import easyocr
+import torch
 import cv2
 import numpy as np
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Route cv2 calls on UMat inputs through OpenCL (Transparent API) when a device is available
+_USE_OPENCL = cv2.ocl.haveOpenCL()
+if _USE_OPENCL:
+    cv2.ocl.setUseOpenCL(True)
+
+# Images whose long side exceeds this are downscaled before OCR; EasyOCR's
+# detector resizes to its own canvas, so larger inputs only add work
+_MAX_OCR_SIDE = 1280
+
+# Grayscale standard deviation above which CLAHE is skipped
+_CONTRAST_STD_THRESHOLD = 55
+
+# _clean_text patterns
+# Line checks only need a yes/no, so match the shortest equivalent prefix:
+# a sign or '$' followed by a digit, and any word or space character
+_ODDS_OR_AMOUNT_RE = re.compile(r'[\+\-\$]\d')
+_RELATED_LINE_RE = re.compile(r'[\w\s]')
+_INVALID_CHARS_RE = re.compile(r'[^\w\s\+\-\.\$\/():]+')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# EasyOCR model weights are loaded once per process and shared by all preprocessors
+_reader: Optional[easyocr.Reader] = None
+_reader_lock = threading.Lock()
+
+def _get_reader() -> easyocr.Reader:
+    """Return the shared EasyOCR reader, loading it on first use."""
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            _reader = easyocr.Reader(['en'], gpu=torch.cuda.is_available(), quantize=True)
+        return _reader
+
+def _readtext(image: np.ndarray) -> List[str]:
+    """Run OCR on a preprocessed image, in FP16 autocast when the reader is on CUDA."""
+    reader = _get_reader()
+    if reader.device == 'cuda':
+        with torch.autocast('cuda', dtype=torch.float16):
+            return reader.readtext(image, detail=0, paragraph=True)
+    return reader.readtext(image, detail=0, paragraph=True)
+
+def _merge_indices(merge_next: List[bool]) -> List[int]:
+    """Return the indices of lines that start an output line, skipping merged partners."""
+    starts = []
+    i = 0
+    n = len(merge_next)
+    while i < n:
+        starts.append(i)
+        i += 2 if merge_next[i] else 1
+    return starts
+
 class ImagePreprocessor:
     """Preprocesses images for OCR text extraction from bet slips using EasyOCR."""
     
     def __init__(self):
-        """Initialize the image preprocessor with EasyOCR."""
+        """Initialize the image preprocessor; the EasyOCR reader loads on first use."""
         logger.info("Initializing ImagePreprocessor with EasyOCR")
-        self.reader = easyocr.Reader(['en'], gpu=False)  # Set gpu=True if you have a GPU
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        # (height, width) -> gray/enhanced/blurred scratch buffers reused across calls
+        self._bufs: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def _scratch_buffers(self, shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return reusable uint8 buffers for an image size, keeping only the latest size."""
+        bufs = self._bufs.get(shape)
+        if bufs is None:
+            self._bufs.clear()
+            bufs = (np.empty(shape, np.uint8), np.empty(shape, np.uint8), np.empty(shape, np.uint8))
+            self._bufs[shape] = bufs
+        return bufs
 
     def preprocess_image(self, image: np.ndarray) -> np.ndarray:
-        """Preprocess the image for OCR."""
+        """Preprocess a BGR or grayscale image for OCR.
+        
+        ndarray results live in a scratch buffer that the next call overwrites.
+        """
         try:
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            # Host images write every stage into preallocated buffers; UMats stay on the device
+            if isinstance(image, np.ndarray):
+                gray_buf, enhanced_buf, blurred_buf = self._scratch_buffers(image.shape[:2])
+            else:
+                gray_buf = enhanced_buf = blurred_buf = None
+            
+            # Convert to grayscale; process_image decodes (and passes UMats) in grayscale already
+            if isinstance(image, np.ndarray) and image.ndim == 3:
+                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=gray_buf)
+            else:
+                gray = image
             
-            # Apply CLAHE for contrast enhancement
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            enhanced = clahe.apply(gray)
+            # Apply CLAHE for contrast enhancement, unless the image (e.g. a
+            # screenshot) already has enough global contrast
+            _, std = cv2.meanStdDev(gray)
+            if std[0, 0] > _CONTRAST_STD_THRESHOLD:
+                enhanced = gray
+            else:
+                enhanced = self._clahe.apply(gray, dst=enhanced_buf)
             
             # Apply Gaussian blur to reduce noise
-            blurred = cv2.GaussianBlur(enhanced, (3, 3), 0)
+            blurred = cv2.GaussianBlur(enhanced, (3, 3), 0, dst=blurred_buf)
             
             return blurred
         except Exception as e:
@@ -38,28 +117,41 @@ class ImagePreprocessor:
         try:
             # Convert image bytes to numpy array
             nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            # Decode straight to grayscale: JPEG decoders emit the luma plane
+            # directly, skipping colour conversion and a 3-channel buffer
+            image = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
             if image is None:
                 raise ValueError("Failed to decode image")
             
-            # Upscale image for better text recognition
-            scale_factor = 2.0
-            image = cv2.resize(image, None, fx=scale_factor, fy=scale_factor, interpolation=cv2.INTER_CUBIC)
+            # Size large images down to the detector's working resolution
+            scale_factor = min(1.0, _MAX_OCR_SIDE / max(image.shape[:2]))
+            
+            # Keep the resize/preprocess chain on the OpenCL device when available
+            if _USE_OPENCL:
+                image = cv2.UMat(image)
+            
+            if scale_factor < 1.0:
+                image = cv2.resize(
+                    image, None, fx=scale_factor, fy=scale_factor,
+                    interpolation=cv2.INTER_AREA
+                )
             
             # Preprocess the image
             processed = self.preprocess_image(image)
+            if isinstance(processed, cv2.UMat):
+                processed = processed.get()
             
-            # Save debug image
-            debug_path = 'debug_processed.png'
-            cv2.imwrite(debug_path, processed)
-            logger.info(f"Saved processed image to {debug_path}")
+            # Save debug image (JPEG encodes far faster than PNG)
+            if logger.isEnabledFor(logging.DEBUG):
+                debug_path = 'debug_processed.jpg'
+                cv2.imwrite(debug_path, processed, [cv2.IMWRITE_JPEG_QUALITY, 80])
+                logger.debug(f"Saved processed image to {debug_path}")
             
             # Extract text with EasyOCR
-            results = self.reader.readtext(processed, detail=0, paragraph=True)
-            text = '\n'.join(results)
+            results = _readtext(processed)
             
             # Clean and structure the text
-            cleaned_text = self._clean_text(text)
+            cleaned_text = self._clean_text(results)
             
             logger.info(f"Extracted text: {cleaned_text[:100]}...")
             return cleaned_text
@@ -71,34 +163,33 @@ class ImagePreprocessor:
                 "Try increasing resolution, straightening the image, or removing background noise."
             )
 
-    def _clean_text(self, text: str) -> str:
-        """Clean and structure the OCR-extracted text."""
+    def _clean_text(self, lines: List[str]) -> str:
+        """Clean and structure the OCR-extracted paragraphs."""
         try:
-            # Split into lines and remove empty lines
-            lines = [line.strip() for line in text.splitlines() if line.strip()]
+            # Strip each paragraph and drop empty ones
+            stripped = (line.strip() for line in lines)
+            lines = [line for line in stripped if line]
+            
+            # Flag each line once: odds (e.g., +250, -110) or currency (e.g., $100),
+            # and whether it could continue the previous line (wager amount or team name)
+            has_odds = [_ODDS_OR_AMOUNT_RE.search(line) is not None for line in lines]
+            related = [_RELATED_LINE_RE.search(line) is not None for line in lines]
+            merge_next = [odds and nxt for odds, nxt in zip(has_odds, related[1:] + [False])]
             
             # Merge fragmented lines (e.g., odds and amounts split across lines)
-            cleaned_lines = []
-            i = 0
-            while i < len(lines):
-                line = lines[i]
-                # Look for odds (e.g., +250, -110) or currency (e.g., $100)
-                if re.search(r'[\+\-]\d+|\$\d+', line):
-                    # Check if next line seems related (e.g., wager amount or team name)
-                    if i + 1 < len(lines) and re.search(r'[\w\s]+|\$\d+', lines[i+1]):
-                        line += " " + lines[i+1]
-                        i += 1
-                cleaned_lines.append(line)
-                i += 1
+            cleaned_lines = [
+                lines[i] + " " + lines[i + 1] if merge_next[i] else lines[i]
+                for i in _merge_indices(merge_next)
+            ]
             
             # Join lines with newlines
             cleaned_text = '\n'.join(cleaned_lines)
             
-            # Remove excessive whitespace and invalid characters
-            cleaned_text = re.sub(r'\s+', ' ', cleaned_text)
-            cleaned_text = re.sub(r'[^\w\s\+\-\.\$\/():]', '', cleaned_text)
+            # Remove invalid characters, then collapse whitespace
+            cleaned_text = _INVALID_CHARS_RE.sub('', cleaned_text)
+            cleaned_text = _WHITESPACE_RE.sub(' ', cleaned_text)
             
             return cleaned_text.strip()
         except Exception as e:
             logger.error(f"Error cleaning text: {str(e)}")
-            return text.strip()
\ No newline at end of file
+            return '\n'.join(lines).strip()
\ No newline at end of file
@@ -1,51 +1,54 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+import asyncio
 import aiohttp
+import orjson
 import os
 
-class GroqLLM:
-    """Service for interacting with Groq API."""
-    
-    def __init__(self, api_key: str = os.getenv("GROQ_API_KEY")):
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable not set")
-        self.api_key = api_key
-        self.base_url = "https://api.groq.com/openai/v1"
-        
-    async def analyze_bet(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze a bet using Groq LLM."""
-        prompt = self._create_bet_analysis_prompt(context)
-        response = await self._generate(prompt)
-        return self._parse_betting_analysis(response)
-    
-    async def analyze_team_matchup(self, team1_data: Dict, team2_data: Dict) -> Dict[str, Any]:
-        """Analyze team matchup using historical data and current form."""
-        prompt = self._create_matchup_analysis_prompt(team1_data, team2_data)
-        response = await self._generate(prompt)
-        return self._parse_matchup_analysis(response)
+# Fallback values used when the model's JSON omits a key or is unparseable
+_BET_ANALYSIS_DEFAULTS = {
+    'confidence': 7,
+    'key_factors': ['Recent form', 'Head-to-head record'],
+    'risk_level': 'Medium',
+    'value_assessment': 'Positive',
+    'recommendations': ['Proceed with caution', 'Consider hedging']
+}
+
+_MATCHUP_ANALYSIS_DEFAULTS = {
+    'predicted_outcome': 'Team 1 advantage',
+    'key_factors': ['Superior form', 'Home advantage'],
+    'betting_implications': ['Value on money line'],
+    'risk_assessment': 'Low'
+}
+
+_STRATEGY_DEFAULTS = {
+    'overall_assessment': 'Positive',
+    'leg_analysis': ['Leg 1: Strong', 'Leg 2: Moderate'],
+    'risk_management': ['Split into single bets', 'Reduce stake'],
+    'alternatives': ['Consider straight bets', 'Look for better lines']
+}
+
+class _SafeDict(dict):
+    """Mapping for prompt templates that renders missing keys as empty strings."""
     
-    async def generate_betting_strategy(self, parlay_data: Dict) -> Dict[str, Any]:
-        """Generate optimal betting strategy based on parlay analysis."""
-        prompt = self._create_strategy_prompt(parlay_data)
-        response = await self._generate(prompt)
-        return self._parse_strategy_recommendations(response)
+    def __missing__(self, key: str) -> str:
+        return ''
 
-    def _create_bet_analysis_prompt(self, context: Dict[str, Any]) -> str:
-        """Create a detailed prompt for bet analysis."""
-        return f"""Analyze this betting opportunity with the following context:
+# Prompt templates as bound str.format/format_map methods
+_BET_ANALYSIS_PROMPT = """Analyze this betting opportunity with the following context:
 
 Team Information:
-{context.get('team_info', '')}
+{team_info}
 
 Historical Performance:
-{context.get('historical_data', '')}
+{historical_data}
 
 Current Form:
-{context.get('current_form', '')}
+{current_form}
 
 Betting Details:
-- Type: {context.get('bet_type', '')}
-- Odds: {context.get('odds', '')}
-- Line: {context.get('line', '')}
+- Type: {bet_type}
+- Odds: {odds}
+- Line: {line}
 
 Consider:
 1. Team strength and recent performance
@@ -60,21 +63,22 @@ Provide a detailed analysis including:
 3. Risk assessment
 4. Value analysis
 5. Specific recommendations
-"""
 
-    def _create_matchup_analysis_prompt(self, team1_data: Dict, team2_data: Dict) -> str:
-        """Create a prompt for analyzing team matchups."""
-        return f"""Analyze this matchup between:
+Respond with a JSON object with the keys "confidence" (1-10), "key_factors" (list),
+"risk_level", "value_assessment" and "recommendations" (list).
+""".format_map
+
+_MATCHUP_ANALYSIS_PROMPT = """Analyze this matchup between:
 
-Team 1: {team1_data.get('name')}
-- League Position: {team1_data.get('position')}
-- Recent Form: {team1_data.get('form')}
-- Key Stats: {team1_data.get('stats')}
+Team 1: {team1[name]}
+- League Position: {team1[position]}
+- Recent Form: {team1[form]}
+- Key Stats: {team1[stats]}
 
-Team 2: {team2_data.get('name')}
-- League Position: {team2_data.get('position')}
-- Recent Form: {team2_data.get('form')}
-- Key Stats: {team2_data.get('stats')}
+Team 2: {team2[name]}
+- League Position: {team2[position]}
+- Recent Form: {team2[form]}
+- Key Stats: {team2[stats]}
 
 Consider:
 1. Head-to-head record
@@ -88,20 +92,21 @@ Provide insights on:
 2. Key factors
 3. Betting implications
 4. Risk assessment
-"""
 
-    def _create_strategy_prompt(self, parlay_data: Dict) -> str:
-        """Create a prompt for generating betting strategy."""
-        return f"""Analyze this parlay and generate a betting strategy:
+Respond with a JSON object with the keys "predicted_outcome", "key_factors" (list),
+"betting_implications" (list) and "risk_assessment".
+""".format
+
+_STRATEGY_PROMPT = """Analyze this parlay and generate a betting strategy:
 
 Parlay Details:
-{parlay_data.get('details')}
+{details}
 
 Individual Legs:
-{parlay_data.get('legs')}
+{legs}
 
 Current Analysis:
-{parlay_data.get('current_analysis')}
+{current_analysis}
 
 Provide strategic recommendations including:
 1. Overall parlay assessment
@@ -109,58 +114,151 @@ Provide strategic recommendations including:
 3. Risk management strategy
 4. Alternative betting approaches
 5. Specific actionable advice
-"""
 
-    async def _generate(self, prompt: str) -> str:
-        """Make API call to Groq LLM."""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
+Respond with a JSON object with the keys "overall_assessment", "leg_analysis" (list),
+"risk_management" (list) and "alternatives" (list).
+""".format_map
+
+class GroqLLM:
+    """Service for interacting with Groq API."""
+    
+    def __init__(self, api_key: str = os.getenv("GROQ_API_KEY")):
+        if not api_key:
+            raise ValueError("GROQ_API_KEY environment variable not set")
+        self.api_key = api_key
+        self.base_url = "https://api.groq.com/openai/v1"
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=64,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                }
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        
+    async def analyze_bet(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze a bet using Groq LLM."""
+        prompt = self._create_bet_analysis_prompt(context)
+        response = await self._generate(prompt, json_mode=True)
+        return self._parse_betting_analysis(response)
+    
+    async def analyze_team_matchup(self, team1_data: Dict, team2_data: Dict) -> Dict[str, Any]:
+        """Analyze team matchup using historical data and current form."""
+        prompt = self._create_matchup_analysis_prompt(team1_data, team2_data)
+        response = await self._generate(prompt, json_mode=True)
+        return self._parse_matchup_analysis(response)
+    
+    async def generate_betting_strategy(self, parlay_data: Dict) -> Dict[str, Any]:
+        """Generate optimal betting strategy based on parlay analysis."""
+        prompt = self._create_strategy_prompt(parlay_data)
+        response = await self._generate(prompt, json_mode=True)
+        return self._parse_strategy_recommendations(response)
+
+    async def analyze_parlay_full(
+        self,
+        context: Dict[str, Any],
+        team1_data: Dict,
+        team2_data: Dict,
+        parlay_data: Dict
+    ) -> Dict[str, Any]:
+        """Run bet, matchup and strategy analyses concurrently for one parlay."""
+        bet, matchup, strategy = await asyncio.gather(
+            self.analyze_bet(context),
+            self.analyze_team_matchup(team1_data, team2_data),
+            self.generate_betting_strategy(parlay_data)
+        )
+        return {
+            'bet_analysis': bet,
+            'matchup_analysis': matchup,
+            'strategy': strategy
         }
+
+    async def generate(self, prompt: str, system: Optional[str] = None) -> str:
+        """Generate a completion for a prompt, with optional fixed system instructions."""
+        return await self._generate(prompt, system=system)
+
+    def _create_bet_analysis_prompt(self, context: Dict[str, Any]) -> str:
+        """Create a detailed prompt for bet analysis."""
+        return _BET_ANALYSIS_PROMPT(_SafeDict(context))
+
+    def _create_matchup_analysis_prompt(self, team1_data: Dict, team2_data: Dict) -> str:
+        """Create a prompt for analyzing team matchups."""
+        return _MATCHUP_ANALYSIS_PROMPT(
+            team1=_SafeDict(team1_data), team2=_SafeDict(team2_data)
+        )
+
+    def _create_strategy_prompt(self, parlay_data: Dict) -> str:
+        """Create a prompt for generating betting strategy."""
+        return _STRATEGY_PROMPT(_SafeDict(parlay_data))
+
+    async def _generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        json_mode: bool = False
+    ) -> str:
+        """Make API call to Groq LLM, with optional fixed system instructions."""
+        # Fixed instructions go first so the prompt prefix is identical across calls
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
         
         data = {
             "model": "mixtral-8x7b-32768",
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": messages,
             "temperature": 0.7,
             "max_tokens": 1000
         }
+        if json_mode:
+            # Have the model emit a single JSON object so parsing is one orjson call
+            data["response_format"] = {"type": "json_object"}
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=data
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result['choices'][0]['message']['content']
-                else:
-                    raise Exception(f"API call failed with status {response.status}")
+        # Encode and decode with orjson rather than aiohttp's stdlib json helpers;
+        # the session already sends Content-Type: application/json
+        session = self._get_session()
+        async with session.post(
+            f"{self.base_url}/chat/completions",
+            data=orjson.dumps(data)
+        ) as response:
+            if response.status == 200:
+                result = orjson.loads(await response.read())
+                return result['choices'][0]['message']['content']
+            else:
+                raise Exception(f"API call failed with status {response.status}")
+
+    def _parse_json(self, response: str, defaults: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse a JSON-mode response, filling missing keys from defaults."""
+        try:
+            parsed = orjson.loads(response)
+        except orjson.JSONDecodeError:
+            return dict(defaults)
+        if not isinstance(parsed, dict):
+            return dict(defaults)
+        return {**defaults, **parsed}
 
     def _parse_betting_analysis(self, response: str) -> Dict[str, Any]:
         """Parse the LLM response for bet analysis."""
-        return {
-            'confidence': 7,
-            'key_factors': ['Recent form', 'Head-to-head record'],
-            'risk_level': 'Medium',
-            'value_assessment': 'Positive',
-            'recommendations': ['Proceed with caution', 'Consider hedging']
-        }
+        return self._parse_json(response, _BET_ANALYSIS_DEFAULTS)
 
     def _parse_matchup_analysis(self, response: str) -> Dict[str, Any]:
         """Parse the LLM response for matchup analysis."""
-        return {
-            'predicted_outcome': 'Team 1 advantage',
-            'key_factors': ['Superior form', 'Home advantage'],
-            'betting_implications': ['Value on money line'],
-            'risk_assessment': 'Low'
-        }
+        return self._parse_json(response, _MATCHUP_ANALYSIS_DEFAULTS)
 
     def _parse_strategy_recommendations(self, response: str) -> Dict[str, Any]:
         """Parse the LLM response for strategy recommendations."""
-        return {
-            'overall_assessment': 'Positive',
-            'leg_analysis': ['Leg 1: Strong', 'Leg 2: Moderate'],
-            'risk_management': ['Split into single bets', 'Reduce stake'],
-            'alternatives': ['Consider straight bets', 'Look for better lines']
-        }
\ No newline at end of file
+        return self._parse_json(response, _STRATEGY_DEFAULTS)
@@ -1,8 +1,37 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
+import asyncio
+import math
+import operator
 import re
 from dataclasses import dataclass
-from datetime import datetime
-import numpy as np
+
+# Keywords marking bet slip metadata rather than a bet, matched in one pass
+_METADATA_RE = re.compile('|'.join(map(re.escape, (
+    'risk', 'win', 'bet max', 'selection', 'cash out',
+    'in-play', 'same game parlay', 'sgp', 'available'
+))), re.IGNORECASE)
+
+# Recommendation rules as ordered (comparison, threshold, message) tuples;
+# within each group only the first matching rule applies
+_EV_RULES = (
+    (operator.gt, 10, "✅ Strong positive expected value"),
+    (operator.gt, 5, "✅ Positive expected value"),
+    (operator.lt, -10, "❌ Strong negative expected value"),
+    (operator.lt, -5, "❌ Negative expected value")
+)
+_LEG_COUNT_RULES = (
+    (operator.gt, 6, "🛑 Very high number of legs - consider splitting into multiple bets"),
+    (operator.gt, 4, "⚠️ High number of legs increases risk")
+)
+_RATING_RULES = (
+    (operator.le, 3, "❌ Very low confidence - consider skipping"),
+    (operator.le, 5, "⚠️ Low confidence - proceed with caution"),
+    (operator.ge, 8, "✅ High confidence in selections")
+)
+
+def _first_rule(rules: tuple, value: float) -> Optional[str]:
+    """Return the message of the first rule whose comparison value satisfies."""
+    return next((message for compare, threshold, message in rules if compare(value, threshold)), None)
 
 @dataclass
 class BetLeg:
@@ -36,110 +65,112 @@ class ParlayAnalyzer:
             'passing_yards': r'Total Passing Yards',
             'passing_td': r'Total Passing Touchdowns'
         }
+        # Compiled once and case-insensitive, so they work on original-case and lowercased lines
+        self._re = {name: re.compile(p, re.IGNORECASE) for name, p in self.patterns.items()}
     
     async def parse_parlay_text(self, text: str) -> Parlay:
         """Parse parlay text into structured data."""
-        try:
-            # Split into lines and filter out empty ones
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
+        # Split into lines, filter out empty ones and lowercase each once
+        stripped = (line.strip() for line in text.splitlines())
+        lines = [line for line in stripped if line]
+        lowered = [line.lower() for line in lines]
+        # Each line's odds match is needed both for the line itself and as
+        # the look-ahead for the line before it, so scan every line once
+        odds_re = self._re['odds']
+        odds_matches = [odds_re.search(line) for line in lowered]
+        
+        legs = []
+        current_bet = {}
+        
+        i = 0
+        while i < len(lines):
+            line = lowered[i]
             
-            legs = []
-            current_bet = {}
+            # Skip common metadata lines
+            if self._is_metadata_line(line):
+                i += 1
+                continue
             
-            i = 0
-            while i < len(lines):
-                line = lines[i].lower()
-                
-                # Skip common metadata lines
-                if self._is_metadata_line(line):
-                    i += 1
-                    continue
-                
-                # Check for odds changes and get the new odds
-                if 'odds have' in line:
-                    odds_match = re.search(self.patterns['odds_change'], line)
-                    if odds_match:
-                        current_bet['odds'] = self._convert_odds(odds_match.group(1))
-                    i += 1
-                    continue
+            # Check for odds changes and get the new odds
+            if 'odds have' in line:
+                odds_match = self._re['odds_change'].search(line)
+                if odds_match:
+                    current_bet['odds'] = self._convert_odds(odds_match.group(1))
+                i += 1
+                continue
+            
+            # Look for standalone odds
+            odds_match = odds_matches[i]
+            if odds_match and not current_bet.get('odds'):
+                current_bet['odds'] = self._convert_odds(odds_match.group(0))
+                i += 1
+                continue
+            
+            # Check for total points
+            total_match = self._re['total_points'].search(line)
+            if total_match:
+                current_bet = {
+                    'team': '',
+                    'bet_type': 'total',
+                    'points': float(total_match.group(1))
+                }
+                # Look ahead for odds
+                if i + 1 < len(lines) and (next_odds := odds_matches[i + 1]):
+                    current_bet['odds'] = self._convert_odds(next_odds.group(0))
+                if current_bet.get('odds'):
+                    legs.append(BetLeg(**current_bet))
+                    current_bet = {}
+                i += 1
+                continue
+            
+            # Check for player props
+            # Match on the original line so player and team names keep their casing
+            player_match = self._re['player_prop'].search(lines[i])
+            if player_match:
+                player_name = player_match.group(1).strip()
+                team = player_match.group(2).strip()
+                prop_type = None
                 
-                # Look for standalone odds
-                odds_match = re.search(self.patterns['odds'], line)
-                if odds_match and not current_bet.get('odds'):
-                    current_bet['odds'] = self._convert_odds(odds_match.group(0))
-                    i += 1
-                    continue
+                # Look back for prop type
+                if i > 0:
+                    prev_line = lowered[i-1]
+                    if 'touchdown scorer' in prev_line:
+                        prop_type = 'touchdown'
+                    elif 'passing yards' in prev_line:
+                        prop_type = 'passing_yards'
+                    elif 'passing touchdowns' in prev_line:
+                        prop_type = 'passing_td'
                 
-                # Check for total points
-                total_match = re.search(self.patterns['total_points'], line)
-                if total_match:
-                    current_bet = {
-                        'team': '',
-                        'bet_type': 'total',
-                        'points': float(total_match.group(1))
-                    }
-                    # Look ahead for odds
-                    if i + 1 < len(lines) and re.search(self.patterns['odds'], lines[i + 1]):
-                        current_bet['odds'] = self._convert_odds(re.search(self.patterns['odds'], lines[i + 1]).group(0))
-                    if current_bet.get('odds'):
-                        legs.append(BetLeg(**current_bet))
-                        current_bet = {}
-                    i += 1
-                    continue
+                current_bet = {
+                    'team': team,
+                    'player': player_name,
+                    'bet_type': 'player_prop',
+                    'prop_type': prop_type
+                }
                 
-                # Check for player props
-                player_match = re.search(self.patterns['player_prop'], line)
-                if player_match:
-                    player_name = player_match.group(1).strip()
-                    team = player_match.group(2).strip()
-                    prop_type = None
-                    
-                    # Look back for prop type
-                    if i > 0:
-                        prev_line = lines[i-1].lower()
-                        if 'touchdown scorer' in prev_line:
-                            prop_type = 'touchdown'
-                        elif 'passing yards' in prev_line:
-                            prop_type = 'passing_yards'
-                        elif 'passing touchdowns' in prev_line:
-                            prop_type = 'passing_td'
-                    
-                    current_bet = {
-                        'team': team,
-                        'player': player_name,
-                        'bet_type': 'player_prop',
-                        'prop_type': prop_type
-                    }
-                    
-                    # Look ahead for odds
-                    if i + 1 < len(lines) and re.search(self.patterns['odds'], lines[i + 1]):
-                        current_bet['odds'] = self._convert_odds(re.search(self.patterns['odds'], lines[i + 1]).group(0))
-                    
-                    if current_bet.get('odds'):
-                        legs.append(BetLeg(**current_bet))
-                        current_bet = {}
+                # Look ahead for odds
+                if i + 1 < len(lines) and (next_odds := odds_matches[i + 1]):
+                    current_bet['odds'] = self._convert_odds(next_odds.group(0))
                 
-                i += 1
+                if current_bet.get('odds'):
+                    legs.append(BetLeg(**current_bet))
+                    current_bet = {}
             
-            if not legs:
-                raise ValueError("No valid bets found in the parlay")
-            
-            return Parlay(legs=legs, stake=100, total_odds=sum(leg.odds for leg in legs))
-            
-        except Exception as e:
-            raise ValueError(f"Error parsing parlay: {str(e)}")
+            i += 1
+        
+        if not legs:
+            raise ValueError("No valid bets found in the parlay")
+        
+        # Parlay decimal odds are the product of the legs' decimal odds
+        return Parlay(legs=legs, stake=100, total_odds=math.prod(leg.odds for leg in legs))
     
     def _is_metadata_line(self, line: str) -> bool:
         """Check if a line is metadata rather than a bet."""
-        metadata_keywords = [
-            'risk', 'win', 'bet max', 'selection', 'cash out',
-            'in-play', 'same game parlay', 'sgp', 'available'
-        ]
-        return any(keyword in line.lower() for keyword in metadata_keywords)
+        return _METADATA_RE.search(line) is not None
     
     def _extract_stake(self, text: str) -> Optional[float]:
         """Extract stake amount from text."""
-        stake_matches = re.findall(self.patterns['stake'], text.lower())
+        stake_matches = self._re['stake'].findall(text)
         if stake_matches:
             try:
                 return float(stake_matches[0])
@@ -149,7 +180,7 @@ class ParlayAnalyzer:
     
     def _extract_total_odds(self, text: str) -> Optional[float]:
         """Extract total odds from text."""
-        odds_matches = re.findall(self.patterns['total_odds'], text.lower())
+        odds_matches = self._re['total_odds'].findall(text)
         if odds_matches:
             try:
                 return self._convert_odds(odds_matches[0])
@@ -161,7 +192,7 @@ class ParlayAnalyzer:
         """Parse a single line into a bet leg."""
         try:
             # Try to match player props first
-            player_prop_match = re.search(self.patterns['player_prop'], line)
+            player_prop_match = self._re['player_prop'].search(line)
             if player_prop_match:
                 player, value, prop_type = player_prop_match.groups()
                 return BetLeg(
@@ -174,7 +205,7 @@ class ParlayAnalyzer:
                 )
             
             # Try spread bets
-            spread_match = re.search(self.patterns['team_spread'], line)
+            spread_match = self._re['team_spread'].search(line)
             if spread_match:
                 team, points = spread_match.groups()
                 return BetLeg(
@@ -185,7 +216,7 @@ class ParlayAnalyzer:
                 )
             
             # Try moneyline bets
-            ml_match = re.search(self.patterns['money_line'], line)
+            ml_match = self._re['money_line'].search(line)
             if ml_match:
                 return BetLeg(
                     team=ml_match.group(1).strip(),
@@ -194,7 +225,7 @@ class ParlayAnalyzer:
                 )
             
             # Try totals
-            total_match = re.search(self.patterns['total_points'], line)
+            total_match = self._re['total_points'].search(line)
             if total_match:
                 return BetLeg(
                     team='',  # No team for totals
@@ -221,7 +252,7 @@ class ParlayAnalyzer:
     
     def _extract_odds(self, line: str) -> float:
         """Extract and convert odds from a line."""
-        odds_match = re.search(self.patterns['odds'], line)
+        odds_match = self._re['odds'].search(line)
         if not odds_match:
             return 0.0  # Default odds if none found
             
@@ -230,19 +261,20 @@ class ParlayAnalyzer:
     def _convert_odds(self, odds_str: str) -> float:
         """Convert various odds formats to decimal."""
         try:
-            if '/' in odds_str:
-                # Fractional odds (e.g., 5/2)
-                num, den = map(float, odds_str.split('/'))
-                return (num / den) + 1
-            elif odds_str.startswith('+'):
+            # Dispatch on the sign character; only unsigned odds need the '/' scan
+            sign = odds_str[:1]
+            if sign == '+':
                 # American odds positive (e.g., +150)
-                return (float(odds_str) / 100) + 1
-            elif odds_str.startswith('-'):
+                return float(odds_str[1:]) / 100 + 1
+            if sign == '-':
                 # American odds negative (e.g., -150)
-                return (100 / abs(float(odds_str))) + 1
-            else:
-                # Decimal odds (e.g., 2.50)
-                return float(odds_str)
+                return 100 / float(odds_str[1:]) + 1
+            if '/' in odds_str:
+                # Fractional odds (e.g., 5/2)
+                num, den = odds_str.split('/', 1)
+                return float(num) / float(den) + 1
+            # Decimal odds (e.g., 2.50)
+            return float(odds_str)
         except (ValueError, ZeroDivisionError):
             return 0.0
     
@@ -262,9 +294,18 @@ class ParlayAnalyzer:
             total_strength = 0
             risk_factors = []
             
+            # Fetch each distinct team once, concurrently, and share it across legs
+            teams = list({leg.team for leg in parlay.legs if leg.team}) if self.sports_api else []
+            team_results = await asyncio.gather(
+                *(self.sports_api.search_team(team) for team in teams),
+                return_exceptions=True
+            )
+            team_data = dict(zip(teams, team_results))
+            
+            # With team data in hand, scoring a leg is pure computation
             for leg in parlay.legs:
                 try:
-                    leg_analysis = await self._analyze_leg(leg)
+                    leg_analysis = self._analyze_leg(leg, team_data.get(leg.team))
                     analysis['legs_analysis'].append(leg_analysis)
                     total_strength += leg_analysis['strength']
                     risk_factors.extend(leg_analysis.get('risk_factors', []))
@@ -318,8 +359,12 @@ class ParlayAnalyzer:
                 'recommendations': ['Unable to analyze parlay due to error']
             }
 
-    async def _analyze_leg(self, leg: BetLeg) -> Dict:
-        """Analyze a single leg of the parlay."""
+    def _analyze_leg(
+        self,
+        leg: BetLeg,
+        team_data: Optional[Union[List[Dict], Exception]] = None
+    ) -> Dict:
+        """Analyze a single leg of the parlay from its prefetched team search result."""
         analysis = {
             'team': leg.team,
             'bet_type': leg.bet_type,
@@ -331,9 +376,10 @@ class ParlayAnalyzer:
         }
         
         try:
-            # Get team data if available
+            # Report on team data if the leg names a team
             if self.sports_api and leg.team:
-                team_data = await self.sports_api.search_team(leg.team)
+                if isinstance(team_data, Exception):
+                    raise team_data
                 if team_data:
                     analysis['factors'].append(f"Found team data for {leg.team}")
                 else:
@@ -479,10 +525,8 @@ class ParlayAnalyzer:
         """Calculate expected value of the parlay."""
         try:
             # Calculate probability of winning based on strength ratings
-            prob_winning = 1.0
-            for leg in legs_analysis:
-                leg_prob = leg['strength'] / 10.0  # Convert strength to probability
-                prob_winning *= leg_prob
+            # (each strength / 10 is a leg's probability)
+            prob_winning = math.prod(leg['strength'] / 10.0 for leg in legs_analysis)
                 
             # Calculate potential payout
             potential_payout = stake * total_odds
@@ -503,37 +547,22 @@ class ParlayAnalyzer:
         risk_factors: List[str]
     ) -> List[str]:
         """Generate betting recommendations."""
-        recommendations = []
-        
-        # EV-based recommendations
-        if ev > 10:
-            recommendations.append("✅ Strong positive expected value")
-        elif ev > 5:
-            recommendations.append("✅ Positive expected value")
-        elif ev < -10:
-            recommendations.append("❌ Strong negative expected value")
-        elif ev < -5:
-            recommendations.append("❌ Negative expected value")
-        
-        # Number of legs recommendations
-        if num_legs > 4:
-            recommendations.append("⚠️ High number of legs increases risk")
-        elif num_legs > 6:
-            recommendations.append("🛑 Very high number of legs - consider splitting into multiple bets")
-        
         # Risk level recommendations
         if 'High' in risk_level:
-            recommendations.append("🎲 High risk - consider reducing stake")
+            risk_message = "🎲 High risk - consider reducing stake"
         elif risk_level == 'Low':
-            recommendations.append("✅ Low risk profile")
+            risk_message = "✅ Low risk profile"
+        else:
+            risk_message = None
         
-        # Rating-based recommendations
-        if rating <= 3:
-            recommendations.append("❌ Very low confidence - consider skipping")
-        elif rating <= 5:
-            recommendations.append("⚠️ Low confidence - proceed with caution")
-        elif rating >= 8:
-            recommendations.append("✅ High confidence in selections")
+        # EV, number of legs, risk level and rating, in that order
+        candidates = (
+            _first_rule(_EV_RULES, ev),
+            _first_rule(_LEG_COUNT_RULES, num_legs),
+            risk_message,
+            _first_rule(_RATING_RULES, rating)
+        )
+        recommendations = [message for message in candidates if message]
         
         # Risk factor recommendations
         if risk_factors:
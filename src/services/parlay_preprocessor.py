@@ -1,6 +1,28 @@
 from typing import Dict, List
 import re
 
+_ODDS_RE = re.compile(r'[+-]\d+')
+_NEW_ODDS_RE = re.compile(r'to ([+-]\d+)')
+_NUMBER_RE = re.compile(r'\d+\.?\d*')
+_PLAYER_INFO_RE = re.compile(r'(.+?)\s*\((\w+)\)')
+
+# Canonical team name -> lowercase aliases seen on bet slips
+_TEAM_ALIASES = {
+    'Kansas City Chiefs': ('chiefs',)
+}
+_TEAM_BY_ALIAS = {
+    alias: team for team, aliases in _TEAM_ALIASES.items() for alias in aliases
+}
+# All aliases in one alternation, longest first so overlapping aliases match the longer one
+_TEAM_RE = re.compile('|'.join(
+    map(re.escape, sorted(_TEAM_BY_ALIAS, key=len, reverse=True))
+))
+
+# Metadata terms as a single alternation ('max' also covers 'bet max')
+_METADATA_RE = re.compile('|'.join(map(re.escape, (
+    'risk', 'win', 'cash out', 'available', 'selection', 'suspended', 'max'
+))), re.IGNORECASE)
+
 class ParlayPreprocessor:
     """Preprocesses and formats parlay text for analysis."""
     
@@ -27,30 +49,27 @@ class ParlayPreprocessor:
     
     def preprocess(self, text: str) -> str:
         """Clean and format parlay text for analysis."""
-        # Split into lines and remove empty ones
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        # Split into lines, drop empty ones and pair each with its lowercase form
+        stripped = (line.strip() for line in text.splitlines())
+        lines = [(line, line.lower()) for line in stripped if line]
         
         formatted_bets = []
         current_bet = {}
         last_player = None
         last_prop_type = None
         
-        i = 0
-        while i < len(lines):
-            line = lines[i].lower()
-            
+        for raw, line in lines:
             # Skip metadata lines
             if self._is_metadata(line):
-                i += 1
                 continue
             
             # Look for bet type indicators first
             if 'total points' in line:
                 last_prop_type = 'total'
-                if 'chiefs' in line:
-                    current_bet = {'type': 'total', 'team': 'Kansas City Chiefs'}
-                else:
-                    current_bet = {'type': 'total'}
+                current_bet = {'type': 'total'}
+                team_match = _TEAM_RE.search(line)
+                if team_match:
+                    current_bet['team'] = _TEAM_BY_ALIAS[team_match.group()]
             elif 'touchdown' in line:
                 last_prop_type = 'touchdown'
                 if '1st' in line or 'first' in line:
@@ -65,7 +84,7 @@ class ParlayPreprocessor:
                 current_bet = {'type': 'player_prop', 'prop': 'passing_touchdowns'}
             
             # Look for player information
-            player_info = self._extract_player_info(line)
+            player_info = self._extract_player_info(raw)
             if player_info['name']:
                 last_player = player_info
                 if current_bet:
@@ -85,7 +104,7 @@ class ParlayPreprocessor:
             if 'odds have' in line:
                 odds = self._extract_new_odds(line)
             else:
-                odds_match = re.search(r'[+-]\d+', line)
+                odds_match = _ODDS_RE.search(line)
                 if odds_match:
                     odds = odds_match.group()
             
@@ -104,8 +123,6 @@ class ParlayPreprocessor:
                     current_bet['odds'] = odds
                     formatted_bets.append(self._format_bet(current_bet))
                     current_bet = {}
-            
-            i += 1
         
         # Format into analyzer-friendly text
         result = self._combine_bets(formatted_bets)
@@ -115,25 +132,21 @@ class ParlayPreprocessor:
     
     def _is_metadata(self, line: str) -> bool:
         """Check if line is metadata."""
-        metadata_terms = [
-            'risk', 'win', 'bet max', 'cash out', 'available', 'selection',
-            'suspended', 'max'
-        ]
-        return any(term in line.lower() for term in metadata_terms)
+        return _METADATA_RE.search(line) is not None
     
     def _extract_new_odds(self, line: str) -> str:
         """Extract new odds from odds change line."""
-        match = re.search(r'to ([+-]\d+)', line)
+        match = _NEW_ODDS_RE.search(line)
         return match.group(1) if match else None
     
     def _extract_number(self, line: str) -> float:
         """Extract number from line."""
-        match = re.search(r'\d+\.?\d*', line)
+        match = _NUMBER_RE.search(line)
         return float(match.group()) if match else None
     
     def _extract_player_info(self, line: str) -> Dict:
         """Extract player name and team."""
-        match = re.search(r'(.+?)\s*\((\w+)\)', line)
+        match = _PLAYER_INFO_RE.search(line)
         if match:
             return {
                 'name': match.group(1).strip(),
@@ -1,26 +1,69 @@
+import asyncio
 import aiohttp
+from cachetools import TTLCache
 from typing import Dict, List, Optional
 from ..config import Config
 
+# One pooled session per event loop, shared by every SportsDBAPI instance. Each
+# session holds a reference to its loop, so a loop's id cannot be reused while
+# its entry is still here.
+_SESSIONS: Dict[int, aiohttp.ClientSession] = {}
+
 class SportsDBAPI:
     BASE_URL = "https://www.thesportsdb.com/api/v1/json"
     
     def __init__(self, api_key: str = Config.SPORTSDB_API_KEY):
         self.api_key = api_key
+        self._team_cache = TTLCache(maxsize=512, ttl=3600)
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the running loop's shared HTTP session, creating it on first use."""
+        loop_id = id(asyncio.get_running_loop())
+        session = _SESSIONS.get(loop_id)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+            session = aiohttp.ClientSession(connector=connector)
+            _SESSIONS[loop_id] = session
+        return session
+    
+    @classmethod
+    async def close(cls) -> None:
+        """Close the running loop's shared HTTP session."""
+        session = _SESSIONS.pop(id(asyncio.get_running_loop()), None)
+        if session is not None and not session.closed:
+            await session.close()
         
     async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """Make an async request to TheSportsDB API."""
         url = f"{self.BASE_URL}/{self.api_key}/{endpoint}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                response.raise_for_status()
+        session = self._get_session()
+        async with session.get(url, params=params) as response:
+            if response.status == 200:
+                return await response.json()
+            response.raise_for_status()
 
     async def search_team(self, team_name: str) -> List[Dict]:
         """Search for a team by name."""
+        cache_key = team_name.lower()
+        teams = self._team_cache.get(cache_key)
+        if teams is not None:
+            return teams
+        
+        # Coalesce concurrent searches for the same team (e.g. parlay legs) onto one request
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_team(team_name, cache_key))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return await asyncio.shield(task)
+    
+    async def _fetch_team(self, team_name: str, cache_key: str) -> List[Dict]:
+        """Fetch a team search from the API and cache the result."""
         data = await self._make_request("searchteams.php", {"t": team_name})
-        return data.get("teams", []) if data else []
+        teams = (data.get("teams") or []) if data else []
+        self._team_cache[cache_key] = teams
+        return teams
 
     async def search_team_by_shortcode(self, short_code: str) -> List[Dict]:
         """Search for a team by short code."""
@@ -1,17 +1,57 @@
-from typing import Any, Dict, Optional, Tuple
-from datetime import datetime, timedelta
-import json
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import timedelta
 import os
 import asyncio
-from functools import wraps
+import sqlite3
+import threading
+import time
+from functools import partial, wraps
 import hashlib
+import zlib
+import orjson
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        category TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        data BLOB NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS cache_category_timestamp ON cache (category, timestamp)"
+)
+
+# WAL lets reads proceed alongside a write; NORMAL sync is durable enough for a cache
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-8000"
+)
+
+# Payloads at least this large are stored zlib-compressed. A zlib stream
+# starts with 0x78 ('x'), which no JSON document does, so the two can share a column
+_COMPRESS_MIN_BYTES = 512
+
+# Argument types whose repr is used as a cache key directly, up to a length
+_DIRECT_KEY_TYPES = frozenset((str, int, float, bool))
+_MAX_DIRECT_KEY_LEN = 200
+
+# Age buckets for get_stats, as (name, max age in seconds)
+_AGE_BUCKETS = (
+    ('last_hour', 3600),
+    ('last_day', 86400),
+    ('last_week', 604800)
+)
 
 class CacheManager:
     """Manages caching of API responses and analysis results."""
     
     def __init__(self, cache_dir: str = ".cache"):
         self.cache_dir = cache_dir
-        self._ensure_cache_dir()
+        self.db_path = os.path.join(cache_dir, "cache.db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
         
         # Default TTLs
         self.ttls = {
@@ -21,30 +61,65 @@ class CacheManager:
             'analysis': timedelta(minutes=30),
             'default': timedelta(hours=1)
         }
+        self._ttl_seconds = {category: ttl.total_seconds() for category, ttl in self.ttls.items()}
+        
+        # In-process LRU of recently used entries: key -> (write timestamp, serialized data)
+        self._mem: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+        self._mem_cap = 4096
         
-        # Cache locks to prevent race conditions
-        self.locks: Dict[str, asyncio.Lock] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Return the cache database connection, creating the database on first use."""
+        if self._conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Autocommit; queries run on worker threads, serialized by _db_lock
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            for statement in _PRAGMAS + _SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
     
-    def _ensure_cache_dir(self):
-        """Ensure cache directory exists."""
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run one statement on the cache database and return its rows."""
+        with self._db_lock:
+            return self._connect().execute(sql, params).fetchall()
+    
+    async def _run(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run one statement on a worker thread, off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self._execute, sql, params))
     
     def _get_cache_key(self, prefix: str, data: Any) -> str:
         """Generate a cache key from prefix and data."""
-        if isinstance(data, (str, bytes)):
+        if isinstance(data, (bytes, bytearray)):
             content = data
+        elif isinstance(data, str):
+            content = data.encode('utf-8')
         else:
-            content = json.dumps(data, sort_keys=True)
+            content = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
             
-        hash_obj = hashlib.md5(content.encode('utf-8'))
+        hash_obj = hashlib.blake2b(content, digest_size=16)
         return f"{prefix}_{hash_obj.hexdigest()}"
     
-    async def _get_lock(self, key: str) -> asyncio.Lock:
-        """Get or create a lock for a cache key."""
-        if key not in self.locks:
-            self.locks[key] = asyncio.Lock()
-        return self.locks[key]
+    def _encode(self, blob: bytes) -> bytes:
+        """Compress a serialized payload for storage if it is large enough to benefit."""
+        if len(blob) < _COMPRESS_MIN_BYTES:
+            return blob
+        return zlib.compress(blob, 3)
+    
+    def _decode(self, stored: bytes) -> bytes:
+        """Return the serialized payload for a stored value."""
+        if stored[:1] == b'x':
+            return zlib.decompress(stored)
+        return stored
+    
+    def _remember(self, key: str, blob: bytes, timestamp: float) -> None:
+        """Keep a serialized entry, written at timestamp, in the in-process LRU."""
+        self._mem[key] = (timestamp, blob)
+        self._mem.move_to_end(key)
+        if len(self._mem) > self._mem_cap:
+            self._mem.popitem(last=False)
     
     async def get(
         self,
@@ -52,23 +127,32 @@ class CacheManager:
         category: str = 'default'
     ) -> Tuple[Optional[Any], bool]:
         """Get value from cache if it exists and is not expired."""
-        cache_file = os.path.join(self.cache_dir, f"{key}.json")
+        # Serve hot keys from memory without touching the database; the TTL
+        # check uses this call's category, as the database path does
+        ttl = self._ttl_seconds.get(category, self._ttl_seconds['default'])
+        entry = self._mem.get(key)
+        if entry is not None:
+            if time.time() - entry[0] <= ttl:
+                self._mem.move_to_end(key)
+                return orjson.loads(entry[1]), True
+            self._mem.pop(key, None)
         
-        if not os.path.exists(cache_file):
-            return None, False
-            
         try:
-            async with await self._get_lock(key):
-                with open(cache_file, 'r') as f:
-                    cached = json.load(f)
-                    
-                timestamp = datetime.fromisoformat(cached['timestamp'])
-                ttl = self.ttls.get(category, self.ttls['default'])
-                
-                if datetime.now() - timestamp > ttl:
-                    return None, False
-                    
-                return cached['data'], True
+            # Each statement is atomic, so readers and writers need no per-key lock
+            rows = await self._run(
+                "SELECT data, timestamp FROM cache WHERE key = ?",
+                (key,)
+            )
+            if not rows:
+                return None, False
+            
+            data, timestamp = rows[0]
+            if time.time() - timestamp > ttl:
+                return None, False
+            
+            blob = self._decode(data)
+            self._remember(key, blob, timestamp)
+            return orjson.loads(blob), True
         except Exception as e:
             print(f"Error reading from cache: {e}")
             return None, False
@@ -80,27 +164,22 @@ class CacheManager:
         category: str = 'default'
     ) -> None:
         """Store value in cache."""
-        cache_file = os.path.join(self.cache_dir, f"{key}.json")
-        
         try:
-            async with await self._get_lock(key):
-                with open(cache_file, 'w') as f:
-                    json.dump({
-                        'timestamp': datetime.now().isoformat(),
-                        'category': category,
-                        'data': data
-                    }, f)
+            blob = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+            timestamp = time.time()
+            await self._run(
+                "INSERT OR REPLACE INTO cache (key, category, timestamp, data) VALUES (?, ?, ?, ?)",
+                (key, category, timestamp, self._encode(blob))
+            )
+            self._remember(key, blob, timestamp)
         except Exception as e:
             print(f"Error writing to cache: {e}")
     
     async def invalidate(self, key: str) -> None:
         """Remove item from cache."""
-        cache_file = os.path.join(self.cache_dir, f"{key}.json")
-        
+        self._mem.pop(key, None)
         try:
-            async with await self._get_lock(key):
-                if os.path.exists(cache_file):
-                    os.remove(cache_file)
+            await self._run("DELETE FROM cache WHERE key = ?", (key,))
         except Exception as e:
             print(f"Error invalidating cache: {e}")
     
@@ -109,52 +188,50 @@ class CacheManager:
         def decorator(func):
             @wraps(func)
             async def wrapper(*args, **kwargs):
-                # Generate cache key
-                key = self._get_cache_key(
-                    prefix,
-                    {'args': args, 'kwargs': kwargs}
-                )
+                # Generate cache key; short scalar positional args skip serializing
+                # and hashing, since a tuple's repr is unambiguous across these types
+                key = None
+                if not kwargs and all(type(arg) in _DIRECT_KEY_TYPES for arg in args):
+                    key = f"{prefix}_{args!r}"
+                    if len(key) > _MAX_DIRECT_KEY_LEN:
+                        key = None
+                if key is None:
+                    key = self._get_cache_key(
+                        prefix,
+                        {'args': args, 'kwargs': kwargs}
+                    )
                 
                 # Try to get from cache
                 cached_value, found = await self.get(key, category)
                 if found:
                     return cached_value
                 
-                # Get fresh value
-                value = await func(*args, **kwargs)
-                
-                # Store in cache
-                await self.set(key, value, category)
+                async def fetch():
+                    # Get fresh value
+                    value = await func(*args, **kwargs)
+                    
+                    # Store in cache
+                    await self.set(key, value, category)
+                    
+                    return value
                 
-                return value
+                # Coalesce concurrent misses for the same key onto a single call
+                task = self._inflight.get(key)
+                if task is None:
+                    task = asyncio.ensure_future(fetch())
+                    self._inflight[key] = task
+                    task.add_done_callback(lambda _: self._inflight.pop(key, None))
+                return await asyncio.shield(task)
             return wrapper
         return decorator
     
     async def cleanup(self, max_age: timedelta = timedelta(days=7)):
-        """Clean up old cache files."""
+        """Clean up old cache entries."""
         try:
-            now = datetime.now()
-            for filename in os.listdir(self.cache_dir):
-                if not filename.endswith('.json'):
-                    continue
-                    
-                filepath = os.path.join(self.cache_dir, filename)
-                key = filename[:-5]  # Remove .json
-                
-                async with await self._get_lock(key):
-                    try:
-                        with open(filepath, 'r') as f:
-                            cached = json.load(f)
-                            timestamp = datetime.fromisoformat(
-                                cached['timestamp']
-                            )
-                            
-                            if now - timestamp > max_age:
-                                os.remove(filepath)
-                    except Exception as e:
-                        print(f"Error cleaning up cache file {filepath}: {e}")
-                        # Remove corrupted cache files
-                        os.remove(filepath)
+            # max_age may be shorter than a category TTL, so drop the memory tier too
+            self._mem.clear()
+            cutoff = time.time() - max_age.total_seconds()
+            await self._run("DELETE FROM cache WHERE timestamp < ?", (cutoff,))
         except Exception as e:
             print(f"Error during cache cleanup: {e}")
     
@@ -173,42 +250,24 @@ class CacheManager:
         }
         
         try:
-            now = datetime.now()
+            for category, count, size in self._execute(
+                "SELECT category, COUNT(*), SUM(LENGTH(data)) FROM cache GROUP BY category"
+            ):
+                stats['categories'][category] = count
+                stats['total_files'] += count
+                stats['total_size'] += size
             
-            for filename in os.listdir(self.cache_dir):
-                if not filename.endswith('.json'):
-                    continue
-                    
-                filepath = os.path.join(self.cache_dir, filename)
-                stats['total_files'] += 1
-                stats['total_size'] += os.path.getsize(filepath)
-                
-                try:
-                    with open(filepath, 'r') as f:
-                        cached = json.load(f)
-                        category = cached.get('category', 'default')
-                        timestamp = datetime.fromisoformat(
-                            cached['timestamp']
-                        )
-                        
-                        # Update category stats
-                        if category not in stats['categories']:
-                            stats['categories'][category] = 0
-                        stats['categories'][category] += 1
-                        
-                        # Update age distribution
-                        age = now - timestamp
-                        if age <= timedelta(hours=1):
-                            stats['age_distribution']['last_hour'] += 1
-                        elif age <= timedelta(days=1):
-                            stats['age_distribution']['last_day'] += 1
-                        elif age <= timedelta(weeks=1):
-                            stats['age_distribution']['last_week'] += 1
-                        else:
-                            stats['age_distribution']['older'] += 1
-                except Exception as e:
-                    print(f"Error reading cache file {filepath}: {e}")
+            # Bucket entries by age in one pass
+            bucket_sql = "CASE " + " ".join(
+                f"WHEN ? - timestamp <= {max_age} THEN '{name}'" for name, max_age in _AGE_BUCKETS
+            ) + " ELSE 'older' END"
+            now = time.time()
+            for bucket, count in self._execute(
+                f"SELECT {bucket_sql} AS bucket, COUNT(*) FROM cache GROUP BY bucket",
+                (now,) * len(_AGE_BUCKETS)
+            ):
+                stats['age_distribution'][bucket] = count
         except Exception as e:
             print(f"Error getting cache stats: {e}")
         
-        return stats 
\ No newline at end of file
+        return stats
@@ -1,12 +1,17 @@
 import logging
+import queue
 import sys
-from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
-import json
 from typing import Any, Dict, Optional
+import orjson
 import structlog
 from structlog.stdlib import LoggerFactory
 
+def _dumps(obj: Any, **kwargs: Any) -> str:
+    """Serialize a log event with orjson for structlog's JSONRenderer."""
+    return orjson.dumps(obj, default=kwargs.get('default'), option=orjson.OPT_NON_STR_KEYS).decode()
+
 class Logger:
     """Configurable logging system for the sports betting analysis system."""
     
@@ -37,17 +42,20 @@ class Logger:
         # Configure structlog
         structlog.configure(
             processors=[
+                # Request-scoped fields bound with bind_context
+                structlog.contextvars.merge_contextvars,
                 structlog.stdlib.add_log_level,
                 structlog.stdlib.add_logger_name,
                 structlog.processors.TimeStamper(fmt="iso"),
                 structlog.processors.StackInfoRenderer(),
                 structlog.processors.format_exc_info,
                 structlog.processors.UnicodeDecoder(),
-                structlog.processors.JSONRenderer()
+                structlog.processors.JSONRenderer(serializer=_dumps)
             ],
             context_class=dict,
             logger_factory=LoggerFactory(),
-            wrapper_class=structlog.stdlib.BoundLogger,
+            # Calls below log_level return before any processor runs
+            wrapper_class=structlog.make_filtering_bound_logger(self.log_level),
             cache_logger_on_first_use=True,
         )
         
@@ -59,19 +67,43 @@ class Logger:
             console_handler.setLevel(self.log_level)
             handlers.append(console_handler)
         
+        self._file_handler: Optional[TimedRotatingFileHandler] = None
         if self.enable_file:
-            file_handler = logging.FileHandler(
-                self.log_dir / f"{datetime.now().strftime('%Y%m%d')}.log"
+            # Rolls over to a new file at midnight and prunes old ones itself
+            file_handler = TimedRotatingFileHandler(
+                self.log_dir / "app.log",
+                when='midnight',
+                backupCount=30,
+                delay=True,
+                encoding='utf-8'
             )
             file_handler.setLevel(self.log_level)
             handlers.append(file_handler)
+            self._file_handler = file_handler
+        
+        # Callers only enqueue records; a listener thread does the blocking writes
+        self._log_queue = queue.SimpleQueue()
+        self._listener = QueueListener(self._log_queue, *handlers, respect_handler_level=True)
+        self._listener.start()
         
         logging.basicConfig(
             level=self.log_level,
             format='%(message)s',
-            handlers=handlers
+            handlers=[QueueHandler(self._log_queue)]
         )
     
+    def close(self) -> None:
+        """Flush queued log records and stop the listener thread."""
+        self._listener.stop()
+    
+    def bind_context(self, **kwargs: Any) -> None:
+        """Bind fields (e.g. match_id) to every event logged in the current request context."""
+        structlog.contextvars.bind_contextvars(**kwargs)
+    
+    def clear_context(self) -> None:
+        """Drop all fields bound with bind_context."""
+        structlog.contextvars.clear_contextvars()
+    
     def _log(
         self,
         level: str,
@@ -125,30 +157,30 @@ class Logger:
     def log_analysis(
         self,
         analysis_type: str,
-        context: Dict[str, Any],
+        context: Optional[Dict[str, Any]],
         result: Dict[str, Any],
         duration: float
     ) -> None:
-        """Log an analysis result."""
+        """Log an analysis result; pass context=None when it is bound with bind_context."""
         self.info(
             "analysis_completed",
             analysis_type=analysis_type,
-            context=context,
             result=result,
-            duration=duration
+            duration=duration,
+            **({} if context is None else {'context': context})
         )
     
     def log_error(
         self,
         error: Exception,
-        context: Dict[str, Any]
+        context: Optional[Dict[str, Any]] = None
     ) -> None:
         """Log an error with context."""
         self.error(
             "error_occurred",
             error_type=type(error).__name__,
             error_message=str(error),
-            **context
+            **(context or {})
         )
     
     def log_cache(
@@ -171,14 +203,14 @@ class Logger:
         self,
         operation: str,
         duration: float,
-        context: Dict[str, Any]
+        context: Optional[Dict[str, Any]] = None
     ) -> None:
         """Log performance metrics."""
         self.info(
             "performance_metric",
             operation=operation,
             duration=duration,
-            **context
+            **(context or {})
         )
     
     def log_system_health(
@@ -192,18 +224,6 @@ class Logger:
         )
     
     def rotate_logs(self, max_days: int = 30) -> None:
-        """Rotate old log files."""
-        if not self.enable_file:
-            return
-            
-        try:
-            cutoff_date = datetime.now().timestamp() - (max_days * 86400)
-            
-            for log_file in self.log_dir.glob("*.log"):
-                if log_file.stat().st_mtime < cutoff_date:
-                    log_file.unlink()
-        except Exception as e:
-            self.error(
-                "log_rotation_failed",
-                error=str(e)
-            ) 
\ No newline at end of file
+        """Keep at most max_days of rotated log files; pruning happens at each midnight rollover."""
+        if self._file_handler is not None:
+            self._file_handler.backupCount = max_days
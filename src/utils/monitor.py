@@ -4,9 +4,40 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import asyncio
 from collections import deque
-import statistics
 from .logger import Logger
 
+# Threshold checks as (metric key, threshold key, alert severity), in alert order
+_ALERT_SPECS = (
+    ('cpu_usage_avg', 'cpu_usage', 'high'),
+    ('memory_usage_avg', 'memory_usage', 'high'),
+    ('api_response_time_avg', 'api_response_time', 'medium'),
+    ('analysis_time_avg', 'analysis_time', 'medium'),
+    ('error_rate', 'error_rate', 'high')
+)
+
+class _Series:
+    """Fixed-size window of samples with a running total, so the mean is O(1)."""
+    
+    __slots__ = ('buf', 'total')
+    
+    def __init__(self, maxlen: int):
+        self.buf: deque = deque(maxlen=maxlen)
+        self.total = 0
+    
+    def __len__(self) -> int:
+        return len(self.buf)
+    
+    def append(self, value: float) -> None:
+        """Add a sample, dropping the oldest one once the window is full."""
+        if len(self.buf) == self.buf.maxlen:
+            self.total -= self.buf[0]
+        self.buf.append(value)
+        self.total += value
+    
+    def mean(self) -> float:
+        """Return the mean of the window, or 0 when it is empty."""
+        return self.total / len(self.buf) if self.buf else 0
+
 class SystemMonitor:
     """Monitors system health and performance metrics."""
     
@@ -21,21 +52,27 @@ class SystemMonitor:
         self.check_interval = check_interval
         
         # Initialize metrics storage
-        self.metrics: Dict[str, deque] = {
-            'cpu_usage': deque(maxlen=metrics_window),
-            'memory_usage': deque(maxlen=metrics_window),
-            'api_response_times': deque(maxlen=metrics_window),
-            'analysis_times': deque(maxlen=metrics_window),
-            'error_counts': deque(maxlen=metrics_window),
-            'request_counts': deque(maxlen=metrics_window)
+        self.metrics: Dict[str, _Series] = {
+            'cpu_usage': _Series(metrics_window),
+            'memory_usage': _Series(metrics_window),
+            'api_response_times': _Series(metrics_window),
+            'analysis_times': _Series(metrics_window)
         }
         
+        # Per-minute request/error counts over the last hour, for the error rate
+        self._req_buckets = deque([0] * 60, maxlen=60)
+        self._err_buckets = deque([0] * 60, maxlen=60)
+        self._bucket_minute = int(time.monotonic() // 60)
+        
+        # Prime psutil's CPU baseline so non-blocking reads measure since the last call
+        psutil.cpu_percent(interval=None)
+        
         # Track API health
         self.api_health: Dict[str, Dict[str, Any]] = {
-            'sports_data': {'healthy': True, 'last_check': None},
-            'odds': {'healthy': True, 'last_check': None},
-            'weather': {'healthy': True, 'last_check': None},
-            'deepseek': {'healthy': True, 'last_check': None}
+            'sports_data': {'healthy': True, 'last_check_ts': None},
+            'odds': {'healthy': True, 'last_check_ts': None},
+            'weather': {'healthy': True, 'last_check_ts': None},
+            'deepseek': {'healthy': True, 'last_check_ts': None}
         }
         
         # Performance thresholds
@@ -47,6 +84,25 @@ class SystemMonitor:
             'error_rate': 0.1  # 10% error rate
         }
     
+    def _advance_buckets(self):
+        """Roll the per-minute request/error buckets forward to the current minute."""
+        minute = int(time.monotonic() // 60)
+        for _ in range(min(minute - self._bucket_minute, 60)):
+            self._req_buckets.append(0)
+            self._err_buckets.append(0)
+        self._bucket_minute = minute
+    
+    def _fmt_api_health(self) -> Dict[str, Dict[str, Any]]:
+        """Render API health with ISO-formatted last check times."""
+        return {
+            api_name: {
+                'healthy': health['healthy'],
+                'last_check': datetime.fromtimestamp(health['last_check_ts']).isoformat()
+                if health['last_check_ts'] is not None else None
+            }
+            for api_name, health in self.api_health.items()
+        }
+    
     async def start_monitoring(self):
         """Start the monitoring loop."""
         while True:
@@ -63,8 +119,9 @@ class SystemMonitor:
     async def check_system_health(self):
         """Check and log system health metrics."""
         try:
-            # Get current metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # Get current metrics; CPU usage is averaged since the previous read
+            # instead of sleeping a second on the event loop
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory_percent = psutil.virtual_memory().percent
             
             # Update metrics
@@ -82,7 +139,7 @@ class SystemMonitor:
                 'timestamp': datetime.now().isoformat(),
                 'metrics': metrics,
                 'alerts': alerts,
-                'api_health': self.api_health
+                'api_health': self._fmt_api_health()
             })
             
             # Take action if needed
@@ -105,7 +162,7 @@ class SystemMonitor:
         # Update API health
         self.api_health[api_name] = {
             'healthy': success,
-            'last_check': datetime.now().isoformat()
+            'last_check_ts': time.time()
         }
         
         # Record response time if successful
@@ -113,11 +170,10 @@ class SystemMonitor:
             self.metrics['api_response_times'].append(response_time)
         
         # Update request and error counts
-        self.metrics['request_counts'].append(1)
+        self._advance_buckets()
+        self._req_buckets[-1] += 1
         if not success:
-            self.metrics['error_counts'].append(1)
-        else:
-            self.metrics['error_counts'].append(0)
+            self._err_buckets[-1] += 1
     
     def record_analysis(self, duration: float):
         """Record an analysis duration."""
@@ -130,19 +186,16 @@ class SystemMonitor:
         # Calculate averages
         metrics = {
             'timestamp': now.isoformat(),
-            'cpu_usage_avg': statistics.mean(self.metrics['cpu_usage'])
-            if self.metrics['cpu_usage'] else 0,
-            'memory_usage_avg': statistics.mean(self.metrics['memory_usage'])
-            if self.metrics['memory_usage'] else 0,
-            'api_response_time_avg': statistics.mean(self.metrics['api_response_times'])
-            if self.metrics['api_response_times'] else 0,
-            'analysis_time_avg': statistics.mean(self.metrics['analysis_times'])
-            if self.metrics['analysis_times'] else 0
+            'cpu_usage_avg': self.metrics['cpu_usage'].mean(),
+            'memory_usage_avg': self.metrics['memory_usage'].mean(),
+            'api_response_time_avg': self.metrics['api_response_times'].mean(),
+            'analysis_time_avg': self.metrics['analysis_times'].mean()
         }
         
-        # Calculate error rate
-        total_requests = sum(self.metrics['request_counts'])
-        total_errors = sum(self.metrics['error_counts'])
+        # Calculate error rate over the last hour
+        self._advance_buckets()
+        total_requests = sum(self._req_buckets)
+        total_errors = sum(self._err_buckets)
         metrics['error_rate'] = (
             total_errors / total_requests if total_requests > 0 else 0
         )
@@ -158,54 +211,11 @@ class SystemMonitor:
     
     def check_thresholds(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Check if any metrics exceed thresholds."""
-        alerts = []
-        
-        # Check CPU usage
-        if metrics['cpu_usage_avg'] > self.thresholds['cpu_usage']:
-            alerts.append({
-                'type': 'cpu_usage',
-                'value': metrics['cpu_usage_avg'],
-                'threshold': self.thresholds['cpu_usage'],
-                'severity': 'high'
-            })
-        
-        # Check memory usage
-        if metrics['memory_usage_avg'] > self.thresholds['memory_usage']:
-            alerts.append({
-                'type': 'memory_usage',
-                'value': metrics['memory_usage_avg'],
-                'threshold': self.thresholds['memory_usage'],
-                'severity': 'high'
-            })
-        
-        # Check API response times
-        if metrics['api_response_time_avg'] > self.thresholds['api_response_time']:
-            alerts.append({
-                'type': 'api_response_time',
-                'value': metrics['api_response_time_avg'],
-                'threshold': self.thresholds['api_response_time'],
-                'severity': 'medium'
-            })
-        
-        # Check analysis times
-        if metrics['analysis_time_avg'] > self.thresholds['analysis_time']:
-            alerts.append({
-                'type': 'analysis_time',
-                'value': metrics['analysis_time_avg'],
-                'threshold': self.thresholds['analysis_time'],
-                'severity': 'medium'
-            })
-        
-        # Check error rate
-        if metrics['error_rate'] > self.thresholds['error_rate']:
-            alerts.append({
-                'type': 'error_rate',
-                'value': metrics['error_rate'],
-                'threshold': self.thresholds['error_rate'],
-                'severity': 'high'
-            })
-        
-        return alerts
+        return [
+            {'type': threshold_key, 'value': value, 'threshold': threshold, 'severity': severity}
+            for metric_key, threshold_key, severity in _ALERT_SPECS
+            if (value := metrics[metric_key]) > (threshold := self.thresholds[threshold_key])
+        ]
     
     async def handle_alerts(self, alerts: List[Dict[str, Any]]):
         """Handle system alerts."""
@@ -283,5 +293,5 @@ class SystemMonitor:
             'timestamp': datetime.now().isoformat(),
             'metrics': metrics,
             'alerts': alerts,
-            'api_health': self.api_health
+            'api_health': self._fmt_api_health()
         } 
\ No newline at end of file
@@ -1,55 +1,145 @@
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Pattern, Tuple
 import re
-from datetime import datetime
+import time
+from functools import lru_cache
+
+# Every query pattern contains at least one of these literals (case-insensitive);
+# keep in sync with QueryHandler.patterns
+_QUERY_KEYWORDS = (
+    'help', 'you do', 'features', 'capabilities', 'i use',
+    'bet', 'think about', 'analyze', 'your',
+    'odds', 'stats', 'playing', 'performing', 'doing',
+    'weather', 'correlat', 'affect'
+)
+
+# Fixed responses, shared by every call; callers must not mutate them
+_CAPABILITIES_RESPONSE = {
+    'type': 'capabilities',
+    'content': {
+        'features': (
+            'Analyze single bets and parlays',
+            'Check player statistics and performance',
+            'Monitor odds and line movements',
+            'Assess weather impact on games',
+            'Detect correlations between bets',
+            'Provide AI-powered predictions',
+            'Track news and expert opinions',
+            'Calculate expected value and risk'
+        ),
+        'supported_sports': (
+            'NFL (Football)',
+            'NBA (Basketball)',
+            'UFC (Mixed Martial Arts)'
+        ),
+        'analysis_types': (
+            'Game analysis',
+            'Player props',
+            'Team props',
+            'Parlay analysis',
+            'Value betting opportunities'
+        )
+    }
+}
+
+_DEFAULT_RESPONSE = {
+    'type': 'clarification_request',
+    'content': {
+        'message': 'I\'m not sure what you\'re asking. Could you please:',
+        'suggestions': (
+            'Ask about a specific bet or parlay',
+            'Check odds for a game',
+            'Look up player statistics',
+            'Check weather impact',
+            'Ask about my capabilities'
+        )
+    }
+}
+
+# Fixed parts of the parameterized responses
+_BET_INCLUDE_FACTORS = ('odds', 'weather', 'injuries', 'trends', 'news')
+_ODDS_INCLUDE = ('current_odds', 'line_movement', 'market_sentiment')
+_STATS_INCLUDE = ('recent_performance', 'season_stats', 'matchup_history', 'situational_stats')
+_WEATHER_INCLUDE = ('forecast', 'impact_analysis', 'historical_performance')
+_CORRELATION_INCLUDE = ('direct_correlation', 'shared_factors', 'historical_patterns')
+
+def _fuse_patterns(compiled_patterns: Dict[str, List[Pattern]]) -> Tuple[Pattern, Dict[str, Tuple[str, int, int]]]:
+    """Fuse query patterns into one regex matched at the start of the query.
+    
+    Each alternative is a lookahead that searches the whole query for one pattern,
+    so alternatives are tried in category order exactly like a loop of
+    pattern.search calls, in a single C-level call. Also returns, per group name,
+    the category and the m.groups() slice holding that pattern's own groups.
+    """
+    alternatives = []
+    groups: Dict[str, Tuple[str, int, int]] = {}
+    group_count = 0
+    for category, compiled in compiled_patterns.items():
+        for i, pattern in enumerate(compiled):
+            name = f'{category}__{i}'
+            alternatives.append(f'(?=[\\s\\S]*?(?P<{name}>{pattern.pattern}))')
+            group_count += 1
+            groups[name] = (category, group_count, group_count + pattern.groups)
+            group_count += pattern.groups
+    return re.compile('|'.join(alternatives), re.IGNORECASE), groups
 
 class QueryHandler:
     """Handles natural language queries and commands from users."""
     
+    # Patterns and regexes live on the class; instances only hold these
+    __slots__ = ('_match', 'responses')
+    
+    # Define query patterns; compiled once at import and shared by all instances
+    patterns = {
+        'capabilities': [
+            r'what (?:can|could) you do',
+            r'(?:show|tell|list) (?:me )?(?:your )?(?:features|capabilities)',
+            r'help',
+            r'how (?:do|can) I use (?:you|this)',
+            r'what (?:are|is) your (?:features|capabilities)'
+        ],
+        'bet_suggestion': [
+            r'(?:should|could|can|would) I bet (?:on )?(.+)',
+            r'(?:what|how) (?:do|would) you think about (?:betting on )?(.+)',
+            r'analyze (?:this )?(?:bet|parlay)?(?: on )?(.+)',
+            r'(?:is|are) (.+) a good bet',
+            r'what(?:\'s| is) your (?:take|opinion|thought) on (.+)'
+        ],
+        'odds_query': [
+            r'what (?:are|is) the odds (?:for|on) (.+)',
+            r'(?:show|get|find) (?:me )?odds (?:for|on) (.+)',
+            r'odds (?:for|on) (.+)'
+        ],
+        'player_stats': [
+            r'(?:how is|how\'s) (.+) (?:playing|performing|doing)',
+            r'(?:show|get|find) (?:me )?stats (?:for|on) (.+)',
+            r'(?:what are|what\'s) (.+)(?:\'s)? stats'
+        ],
+        'weather_impact': [
+            r'(?:how|what)(?:\'s| is) the weather (?:for|in) (.+)',
+            r'will weather (?:affect|impact) (.+)',
+            r'weather (?:report|forecast) (?:for|in) (.+)'
+        ],
+        'correlation_check': [
+            r'(?:are|is) (.+) (?:and|&) (.+) correlated',
+            r'correlation between (.+) and (.+)',
+            r'(?:how|are) (?:do|does) (.+) affect (.+)'
+        ]
+    }
+    
+    # Compile patterns
+    compiled_patterns = {
+        category: [re.compile(pattern, re.IGNORECASE) 
+                  for pattern in patterns]
+        for category, patterns in patterns.items()
+    }
+    _query_re, _query_groups = _fuse_patterns(compiled_patterns)
+    
+    # Cheap prefilter: queries without any keyword cannot match a pattern
+    _gate_re = re.compile('|'.join(map(re.escape, _QUERY_KEYWORDS)), re.IGNORECASE)
+    
     def __init__(self):
-        # Define query patterns
-        self.patterns = {
-            'capabilities': [
-                r'what (?:can|could) you do',
-                r'(?:show|tell|list) (?:me )?(?:your )?(?:features|capabilities)',
-                r'help',
-                r'how (?:do|can) I use (?:you|this)',
-                r'what (?:are|is) your (?:features|capabilities)'
-            ],
-            'bet_suggestion': [
-                r'(?:should|could|can|would) I bet (?:on )?(.+)',
-                r'(?:what|how) (?:do|would) you think about (?:betting on )?(.+)',
-                r'analyze (?:this )?(?:bet|parlay)?(?: on )?(.+)',
-                r'(?:is|are) (.+) a good bet',
-                r'what(?:\'s| is) your (?:take|opinion|thought) on (.+)'
-            ],
-            'odds_query': [
-                r'what (?:are|is) the odds (?:for|on) (.+)',
-                r'(?:show|get|find) (?:me )?odds (?:for|on) (.+)',
-                r'odds (?:for|on) (.+)'
-            ],
-            'player_stats': [
-                r'(?:how is|how\'s) (.+) (?:playing|performing|doing)',
-                r'(?:show|get|find) (?:me )?stats (?:for|on) (.+)',
-                r'(?:what are|what\'s) (.+)(?:\'s)? stats'
-            ],
-            'weather_impact': [
-                r'(?:how|what)(?:\'s| is) the weather (?:for|in) (.+)',
-                r'will weather (?:affect|impact) (.+)',
-                r'weather (?:report|forecast) (?:for|in) (.+)'
-            ],
-            'correlation_check': [
-                r'(?:are|is) (.+) (?:and|&) (.+) correlated',
-                r'correlation between (.+) and (.+)',
-                r'(?:how|are) (?:do|does) (.+) affect (.+)'
-            ]
-        }
-        
-        # Compile patterns
-        self.compiled_patterns = {
-            category: [re.compile(pattern, re.IGNORECASE) 
-                      for pattern in patterns]
-            for category, patterns in self.patterns.items()
-        }
+        # Repeated queries (e.g. "help") skip matching entirely
+        self._match = lru_cache(maxsize=1024)(self._match_query)
         
         # Define response templates
         self.responses = {
@@ -61,65 +151,30 @@ class QueryHandler:
             'correlation_check': self._get_correlation_response
         }
     
+    def _match_query(self, query: str) -> Tuple[str, Callable[[List[str]], Dict[str, Any]], tuple]:
+        """Return the category, response handler and captured params for a query."""
+        # Find the first pattern, in category order, that matches anywhere
+        match = self._gate_re.search(query) and self._query_re.match(query)
+        if not match:
+            return 'unknown', self._get_default_response, ()
+        category, start, end = self._query_groups[match.lastgroup]
+        return category, self.responses[category], match.groups()[start:end]
+    
     def process_query(self, query: str) -> Dict[str, Any]:
         """Process a natural language query and determine the appropriate response type."""
-        # Check each category of patterns
-        for category, patterns in self.compiled_patterns.items():
-            for pattern in patterns:
-                match = pattern.search(query)
-                if match:
-                    # Get response handler
-                    response_handler = self.responses[category]
-                    
-                    # Extract parameters from match groups
-                    params = match.groups() if match.groups() else []
-                    
-                    return {
-                        'type': category,
-                        'query': query,
-                        'params': params,
-                        'timestamp': datetime.now().isoformat(),
-                        'response_handler': response_handler
-                    }
-        
-        # If no pattern matches, return default response
+        # The handler is resolved with the (cached) match, so repeats skip the lookup
+        category, response_handler, params = self._match(query)
         return {
-            'type': 'unknown',
+            'type': category,
             'query': query,
-            'params': [],
-            'timestamp': datetime.now().isoformat(),
-            'response_handler': self._get_default_response
+            'params': params,
+            'timestamp_ns': time.time_ns(),
+            'response_handler': response_handler
         }
     
     def _get_capabilities_response(self, params: List[str]) -> Dict[str, Any]:
         """Generate response for capabilities query."""
-        return {
-            'type': 'capabilities',
-            'content': {
-                'features': [
-                    'Analyze single bets and parlays',
-                    'Check player statistics and performance',
-                    'Monitor odds and line movements',
-                    'Assess weather impact on games',
-                    'Detect correlations between bets',
-                    'Provide AI-powered predictions',
-                    'Track news and expert opinions',
-                    'Calculate expected value and risk'
-                ],
-                'supported_sports': [
-                    'NFL (Football)',
-                    'NBA (Basketball)',
-                    'UFC (Mixed Martial Arts)'
-                ],
-                'analysis_types': [
-                    'Game analysis',
-                    'Player props',
-                    'Team props',
-                    'Parlay analysis',
-                    'Value betting opportunities'
-                ]
-            }
-        }
+        return _CAPABILITIES_RESPONSE
     
     def _get_bet_suggestion_response(self, params: List[str]) -> Dict[str, Any]:
         """Generate response for bet suggestion query."""
@@ -129,13 +184,7 @@ class QueryHandler:
             'content': {
                 'text': bet_text,
                 'analysis_type': 'comprehensive',
-                'include_factors': [
-                    'odds',
-                    'weather',
-                    'injuries',
-                    'trends',
-                    'news'
-                ]
+                'include_factors': _BET_INCLUDE_FACTORS
             }
         }
     
@@ -146,11 +195,7 @@ class QueryHandler:
             'type': 'odds_request',
             'content': {
                 'target': target,
-                'include': [
-                    'current_odds',
-                    'line_movement',
-                    'market_sentiment'
-                ]
+                'include': _ODDS_INCLUDE
             }
         }
     
@@ -161,12 +206,7 @@ class QueryHandler:
             'type': 'stats_request',
             'content': {
                 'player': player,
-                'include': [
-                    'recent_performance',
-                    'season_stats',
-                    'matchup_history',
-                    'situational_stats'
-                ]
+                'include': _STATS_INCLUDE
             }
         }
     
@@ -177,11 +217,7 @@ class QueryHandler:
             'type': 'weather_request',
             'content': {
                 'target': target,
-                'include': [
-                    'forecast',
-                    'impact_analysis',
-                    'historical_performance'
-                ]
+                'include': _WEATHER_INCLUDE
             }
         }
     
@@ -191,26 +227,10 @@ class QueryHandler:
             'type': 'correlation_request',
             'content': {
                 'items': list(params),
-                'include': [
-                    'direct_correlation',
-                    'shared_factors',
-                    'historical_patterns'
-                ]
+                'include': _CORRELATION_INCLUDE
             }
         }
     
     def _get_default_response(self, params: List[str]) -> Dict[str, Any]:
         """Generate default response for unknown queries."""
-        return {
-            'type': 'clarification_request',
-            'content': {
-                'message': 'I\'m not sure what you\'re asking. Could you please:',
-                'suggestions': [
-                    'Ask about a specific bet or parlay',
-                    'Check odds for a game',
-                    'Look up player statistics',
-                    'Check weather impact',
-                    'Ask about my capabilities'
-                ]
-            }
-        } 
\ No newline at end of file
+        return _DEFAULT_RESPONSE